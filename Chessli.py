@@ -3,9 +3,35 @@ import sys
 import chess
 import chess.engine
 import chess.pgn
+import chess.polyglot
 import PySimpleGUI as sg
+import tkinter as tk
 import time
 import random
+import io
+import math
+import re
+import json
+import csv
+import collections
+import base64
+import codecs
+import fractions
+import threading
+import concurrent.futures
+import contextlib
+import queue
+import multiprocessing
+import multiprocessing.util
+import sqlite3
+try:
+    import numpy as np
+except ImportError:  # Only game reports need NumPy
+    np = None
+try:
+    import psutil
+except ImportError:  # Engine memory is read from /proc instead, where there is one
+    psutil = None
 
 # Constants
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -15,67 +41,1884 @@ PGN_FOLDER_PATH = os.path.join(BASE_DIR, 'pgn')
 HUMAN_VS_ENGINE_PATH = os.path.join(PGN_FOLDER_PATH, 'HumanVSEngine_PGNs')
 ENGINE_VS_ENGINE_PATH = os.path.join(PGN_FOLDER_PATH, 'EngineVSEngine_PGNs')
 ANALYSIS_PATH = os.path.join(PGN_FOLDER_PATH, 'Analysis_PGNs')
+PGN_INDEX_SUFFIX = '.idx'
 
 # Ensure PGN directories exist
 os.makedirs(HUMAN_VS_ENGINE_PATH, exist_ok=True)
 os.makedirs(ENGINE_VS_ENGINE_PATH, exist_ok=True)
 os.makedirs(ANALYSIS_PATH, exist_ok=True)
 
+LC0_FOLDER_PATH = os.path.join(ENGINE_FOLDER_PATH, 'lc0-v0.30.0-windows-cpu-openblas')
+ENGINE_CONFIGS = {
+    'LC0': {
+        'path': os.path.join(LC0_FOLDER_PATH, 'lc0.exe'),
+        'options': {'WeightsFile': os.path.join(LC0_FOLDER_PATH, 't1-256x10-distilled-swa-2432500.pb.gz')},
+        'resources': {'NNCacheSize': 200000},
+    },
+    'Stockfish': {
+        'path': os.path.join(ENGINE_FOLDER_PATH, 'stockfish', 'stockfish-windows-x86-64-avx2.exe'),
+        'options': {},
+        'resources': {'Hash': 64},
+    },
+    'Komodo': {
+        'path': os.path.join(ENGINE_FOLDER_PATH, 'komodo-14', 'Windows', 'komodo-14.1-64bit.exe'),
+        'options': {},
+        'resources': {'Hash': 64},
+    },
+}
+# Engines started in the background as soon as the app opens. LC0 loads a large weights file,
+# so it is only started once it is selected.
+ENGINE_PRELOAD = ('Stockfish', 'Komodo')
+# Length of an optional warm-up search run right after startup (0 disables it)
+ENGINE_WARMUP_TIME = 0
+# Engine instances left unused this many seconds are shut down and started again on their next use
+# (0 keeps them running). The check runs every ENGINE_IDLE_CHECK_INTERVAL seconds.
+ENGINE_IDLE_TIMEOUT = 600
+ENGINE_IDLE_CHECK_INTERVAL = 30
+# Unused instances holding more resident memory than this (MB) are shut down early (0 disables the cap)
+ENGINE_MEMORY_LIMIT_MB = 1024
+
+DIFFICULTY_LEVELS = [
+    "Super Duper Easy",
+    "Easy",
+    "Medium",
+    "Hard",
+    "Impossible"
+]
+# Per-move budgets of every level that searches: a hard time cap, a node cap (None for no cap), and
+# the strength limit applied through UCI_LimitStrength/UCI_Elo or, failing that, 'Skill Level'
+# (None keeps full strength). The low levels use Chessli's own search ('builtin' is its depth, capped
+# by 'nodes' and 'time') and never need an engine process. 'random' is the share of random moves,
+# unchanged from the original levels, so the search only replaces the engine moves.
+# Levels that always search may ponder on the opponent's time in human vs engine games.
+DIFFICULTY_SETTINGS = {
+    "Super Duper Easy": {'random': 1.0, 'builtin': 1, 'nodes': 100, 'time': 0.005},
+    "Easy": {'random': 0.7, 'builtin': 2, 'nodes': 1000, 'time': 0.025},
+    "Medium": {'random': 0.5, 'builtin': 3, 'nodes': 4000, 'time': 0.05},
+    "Hard": {'random': 0.0, 'time': 0.1, 'nodes': 200000, 'elo': 2400, 'skill': 15, 'ponder': True},
+    "Impossible": {'random': 0.0, 'time': 0.1, 'nodes': None, 'elo': None, 'skill': None, 'ponder': True},
+}
+# Seconds an engine may ponder on the opponent's time before the search is stopped to free the core
+PONDER_TIMEOUT = 30
+# Move times kept per engine/difficulty for the latency report
+LATENCY_SAMPLES = 1000
+# Name of the built-in search in reports and telemetry, and the size of its transposition table
+BUILTIN_ENGINE_NAME = "Chessli"
+BUILTIN_TT_SIZE = 50000
+# Per-search telemetry: session logs are written here, and this many records are kept in memory
+TELEMETRY_PATH = os.path.join(BASE_DIR, 'telemetry')
+TELEMETRY_RECORDS = 10000
+# Optional Polyglot opening book used by CustomEngine, and how many plies into the game each
+# difficulty keeps playing book moves (0 disables the book for that level)
+OPENING_BOOK_PATH = os.path.join(ENGINE_FOLDER_PATH, 'book.bin')
+OPENING_BOOK_PLIES = {
+    "Super Duper Easy": 0,
+    "Easy": 4,
+    "Medium": 8,
+    "Hard": 12,
+    "Impossible": 20
+}
+# Headless games longer than this are adjudicated as a draw
+TOURNAMENT_MAX_PLIES = 400
+# Infinite analysis panel: updates per second and moves shown per principal variation
+ANALYSIS_REFRESH_RATE = 4
+ANALYSIS_PV_LENGTH = 8
+# Engine vs engine: pause between moves in normal mode, and board redraws per second in fast mode
+# where the engines play without pausing
+EVE_MOVE_DELAY = 0.1
+EVE_FAST_REFRESH_RATE = 5
+# Time controls offered for games against and between engines, "minutes+increment seconds". The increment
+# is added after every move (Fischer) or gives back the time the move took, up to the increment (Bronstein).
+TIME_CONTROLS = ["None", "1+0", "3+2", "5+3", "10+5", "15+10"]
+INCREMENT_MODES = ["Fischer", "Bronstein"]
+CLOCK_REFRESH_INTERVAL = 0.1
+# Batch annotation: centipawn loss thresholds for ?!, ? and ??, the value of a mate in centipawns,
+# and how many games per worker are in flight at once
+INACCURACY_THRESHOLD = 50
+MISTAKE_THRESHOLD = 100
+BLUNDER_THRESHOLD = 300
+MATE_SCORE = 10000
+ANNOTATION_GAMES_PER_WORKER = 2
+# Positions kept per engine in the in-memory analysis cache
+ANALYSIS_CACHE_SIZE = 4096
+# Maximum number of processes per engine type, can be overridden with 'max_instances' in ENGINE_CONFIGS.
+# Two lets both sides of an engine vs engine game use the same engine without sharing a process.
+ENGINE_POOL_SIZE = 2
+# Engine evaluations are also kept on disk and shared across sessions and worker processes.
+# Writes are batched: they are committed every EVAL_STORE_BATCH_SIZE results or
+# EVAL_STORE_FLUSH_INTERVAL seconds, and when the app exits.
+EVAL_STORE_PATH = os.path.join(BASE_DIR, 'evals.sqlite3')
+EVAL_STORE_BATCH_SIZE = 64
+EVAL_STORE_FLUSH_INTERVAL = 2.0
+# Options that change how fast an engine searches or what it reports, not the evaluation it finds.
+# They are left out of the key results are cached and stored under.
+EVAL_NEUTRAL_OPTIONS = {'Hash', 'Threads', 'Ponder', 'MultiPV', 'NNCacheSize', 'Move Overhead', 'Clear Hash',
+                        'Debug Log File', 'UCI_ShowWDL', 'UCI_AnalyseMode'}
+# Game reports: the slope of the win probability curve (Lichess' model), the cap applied to evaluations
+# before centipawn losses are averaged, and where reports are saved
+WIN_PROBABILITY_SLOPE = 0.00368208
+ACPL_EVAL_CAP = 1000
+REPORT_PATH = os.path.join(BASE_DIR, 'reports')
+
+class SearchCancelled(Exception):
+    pass
+
+class CancelToken:
+    """
+    Shared between whoever starts engine searches and whoever may want to stop them.
+    Cancelling stops every search currently tracked by the token, by calling its stop() or the
+    stop function given to track().
+    """
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._searches = set()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled.set()
+            stops = list(self._searches)
+        for stop in stops:
+            stop()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    @contextlib.contextmanager
+    def track(self, search, stop=None):
+        stop = stop or search.stop
+        with self._lock:
+            self._searches.add(stop)
+        if self.is_cancelled():
+            stop()
+        try:
+            yield search
+        finally:
+            with self._lock:
+                self._searches.discard(stop)
+
+class OpeningBook:
+    """
+    Polyglot opening book, memory-mapped on first use so every engine shares the same pages.
+    A missing or unreadable book simply never returns a move.
+    """
+    def __init__(self, path=OPENING_BOOK_PATH):
+        self.path = path
+        self._reader = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def reader(self):
+        with self._lock:
+            if self._reader is None and not self._failed:
+                try:
+                    self._reader = chess.polyglot.open_reader(self.path)
+                except (OSError, ValueError):
+                    self._failed = True
+            return self._reader
+
+    def choose(self, board, max_plies):
+        """
+        Picks a book move for the position, weighted by the book's move weights, or returns None.
+        """
+        if board.ply() >= max_plies:
+            return None
+        reader = self.reader()
+        if reader is None:
+            return None
+        try:
+            return reader.weighted_choice(board).move
+        except IndexError:
+            return None
+
+    def close(self):
+        with self._lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+OPENING_BOOK = OpeningBook()
+
+class LatencyStats:
+    """
+    Recent move times per (engine, difficulty) with tail-latency percentiles.
+    """
+    def __init__(self, max_samples=LATENCY_SAMPLES):
+        self.max_samples = max_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, seconds):
+        with self._lock:
+            if key not in self._samples:
+                self._samples[key] = collections.deque(maxlen=self.max_samples)
+            self._samples[key].append(seconds)
+
+    def samples(self):
+        with self._lock:
+            return {key: list(samples) for key, samples in self._samples.items()}
+
+    def merge(self, samples):
+        for key, values in samples.items():
+            for seconds in values:
+                self.record(key, seconds)
+
+    @staticmethod
+    def percentile(sorted_values, fraction):
+        return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+    def report(self):
+        lines = []
+        for (engine_name, difficulty), values in sorted(self.samples().items()):
+            values.sort()
+            p50, p90, p99 = (1000 * self.percentile(values, fraction) for fraction in (0.5, 0.9, 0.99))
+            lines.append(f"{engine_name} ({difficulty}): {len(values)} moves, p50 {p50:.0f} ms, "
+                         f"p90 {p90:.0f} ms, p99 {p99:.0f} ms, max {1000 * values[-1]:.0f} ms")
+        return "\n".join(lines) if lines else "No engine moves yet"
+
+MOVE_LATENCY = LatencyStats()
+
+class EngineTelemetry:
+    """
+    Records of every engine search in a session: wall time, depth, seldepth, nodes, nps, hashfull and
+    score. With a folder, each record is appended to telemetry_<session>.csv and close() writes the
+    latency summary per engine and difficulty to telemetry_<session>.json.
+    """
+    FIELDS = ('timestamp', 'engine', 'difficulty', 'kind', 'fen', 'move', 'wall_ms',
+              'depth', 'seldepth', 'nodes', 'nps', 'hashfull', 'score')
+    # What engines are asked to report for telemetry
+    INFO = chess.engine.INFO_BASIC | chess.engine.INFO_SCORE
+
+    def __init__(self, folder=None, max_records=TELEMETRY_RECORDS):
+        self.folder = folder
+        self.session = time.strftime('%Y%m%d_%H%M%S')
+        self.records = collections.deque(maxlen=max_records)
+        self.latency = LatencyStats(max_samples=max_records)
+        self._csv_file = None
+        self._csv_writer = None
+        self._lock = threading.Lock()
+
+    def log_path(self, extension):
+        return os.path.join(self.folder, f"telemetry_{self.session}.{extension}")
+
+    def record(self, engine_name, difficulty, kind, board, move, info, seconds):
+        info = info or {}
+        score = info.get('score')
+        self.add({
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'engine': engine_name,
+            'difficulty': difficulty,
+            'kind': kind,
+            'fen': board.fen(),
+            'move': move.uci() if move else '',
+            'wall_ms': round(1000 * seconds, 2),
+            'depth': info.get('depth'),
+            'seldepth': info.get('seldepth'),
+            'nodes': info.get('nodes'),
+            'nps': info.get('nps'),
+            'hashfull': info.get('hashfull'),
+            'score': str(score.white()) if score is not None else None,
+        })
+
+    def add(self, row):
+        with self._lock:
+            self.records.append(row)
+            # Hints are summarised separately from the moves of each difficulty
+            self.latency.record((row['engine'], row['difficulty'] if row['kind'] == 'move' else row['kind']),
+                                row['wall_ms'] / 1000)
+            if self.folder is None:
+                return
+            try:
+                if self._csv_writer is None:
+                    os.makedirs(self.folder, exist_ok=True)
+                    self._csv_file = open(self.log_path('csv'), 'w', newline='')
+                    self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=self.FIELDS)
+                    self._csv_writer.writeheader()
+                self._csv_writer.writerow(row)
+                self._csv_file.flush()
+            except OSError:
+                self.folder = None  # Keep recording in memory only
+
+    def summary(self):
+        """
+        {engine (difficulty): {searches, p50/p90/p99/max wall ms, mean depth, mean nps}}
+        """
+        with self._lock:
+            records = list(self.records)
+        grouped = {}
+        for row in records:
+            key = f"{row['engine']} ({row['difficulty'] if row['kind'] == 'move' else row['kind']})"
+            grouped.setdefault(key, []).append(row)
+        summary = {}
+        for key, rows in sorted(grouped.items()):
+            walls = sorted(row['wall_ms'] for row in rows)
+            depths = [row['depth'] for row in rows if row['depth'] is not None]
+            rates = [row['nps'] for row in rows if row['nps'] is not None]
+            summary[key] = {
+                'searches': len(rows),
+                'p50_ms': LatencyStats.percentile(walls, 0.5),
+                'p90_ms': LatencyStats.percentile(walls, 0.9),
+                'p99_ms': LatencyStats.percentile(walls, 0.99),
+                'max_ms': walls[-1],
+                'mean_depth': round(sum(depths) / len(depths), 1) if depths else None,
+                'mean_nps': round(sum(rates) / len(rates)) if rates else None,
+            }
+        return summary
+
+    def report(self):
+        lines = []
+        for key, entry in self.summary().items():
+            line = (f"{key}: {entry['searches']} searches, p50 {entry['p50_ms']:.0f} ms, p90 {entry['p90_ms']:.0f} ms, "
+                    f"p99 {entry['p99_ms']:.0f} ms, max {entry['max_ms']:.0f} ms")
+            if entry['mean_depth'] is not None:
+                line += f", depth {entry['mean_depth']}"
+            if entry['mean_nps'] is not None:
+                line += f", {entry['mean_nps']} nps"
+            lines.append(line)
+        return "\n".join(lines) if lines else "No engine searches yet"
+
+    def close(self):
+        with self._lock:
+            if self._csv_file is not None:
+                self._csv_file.close()
+                self._csv_file = None
+                self._csv_writer = None
+            folder = self.folder
+        if folder is not None and self.records:
+            try:
+                with open(self.log_path('json'), 'w') as json_file:
+                    json.dump({'session': self.session, 'summary': self.summary()}, json_file, indent=2)
+            except OSError:
+                pass
+
+TELEMETRY = EngineTelemetry(TELEMETRY_PATH)
+
+def set_search_comments(node, seconds, info=None):
+    # [%emt] with the time the move took and, for searched moves, [%eval] with the engine's score
+    node.set_emt(seconds)
+    if info and info.get('score') is not None:
+        node.set_eval(info['score'], info.get('depth'))
+
+def strength_options(engine, difficulty):
+    """
+    UCI options limiting an engine to a difficulty: UCI_Elo when supported, otherwise Skill Level.
+    Levels without a limit switch the limit off again. Engines supporting neither get no options.
+    """
+    settings = DIFFICULTY_SETTINGS.get(difficulty, {})
+    available = engine.engine.options
+    if 'UCI_LimitStrength' in available and 'UCI_Elo' in available:
+        elo = settings.get('elo')
+        if elo is None:
+            return {'UCI_LimitStrength': False}
+        option = available['UCI_Elo']
+        return {'UCI_LimitStrength': True, 'UCI_Elo': min(max(elo, option.min), option.max)}
+    if 'Skill Level' in available:
+        option = available['Skill Level']
+        skill = settings.get('skill')
+        return {'Skill Level': option.max if skill is None else min(max(skill, option.min), option.max)}
+    return {}
+
+def difficulty_limit(difficulty):
+    settings = DIFFICULTY_SETTINGS[difficulty]
+    return chess.engine.Limit(time=settings['time'], nodes=settings['nodes'])
+
+class TimeControl:
+    """
+    Base time and increment of a game, parsed from "minutes+seconds" (e.g. "5+3").
+    """
+    def __init__(self, base, increment=0.0, mode='Fischer'):
+        if mode not in INCREMENT_MODES:
+            raise ValueError(f"Unknown increment mode: {mode}")
+        self.base = float(base)
+        self.increment = float(increment)
+        self.mode = mode
+
+    @classmethod
+    def parse(cls, text, mode='Fischer'):
+        if not text or text == "None":
+            return None
+        minutes, _, increment = text.partition('+')
+        try:
+            return cls(float(minutes) * 60, float(increment or 0), mode)
+        except ValueError:
+            raise ValueError(f"Invalid time control: {text}") from None
+
+    def pgn_header(self):
+        # PGN TimeControl tag, seconds+seconds. There is no standard notation for Bronstein delay.
+        return f"{self.base:g}+{self.increment:g}"
+
+    def __str__(self):
+        label = f"{self.base / 60:g}+{self.increment:g}"
+        return label if self.mode == 'Fischer' else f"{label} {self.mode}"
+
+class ChessClock:
+    """
+    Remaining time of both sides. run(color) charges the side that was running for its move, adds the
+    increment and starts color's clock; run(None) stops both.
+    """
+    def __init__(self, time_control):
+        self.time_control = time_control
+        self.remaining = {chess.WHITE: time_control.base, chess.BLACK: time_control.base}
+        self.running = None
+        self._started = None
+        # The GUI thread and engine workers both read the clock
+        self._lock = threading.Lock()
+
+    def run(self, color, increment=True):
+        with self._lock:
+            now = time.perf_counter()
+            if self.running is not None:
+                used = now - self._started
+                self.remaining[self.running] -= used
+                # A flagged side gets nothing back
+                if increment and self.remaining[self.running] > 0:
+                    if self.time_control.mode == 'Bronstein':
+                        self.remaining[self.running] += min(used, self.time_control.increment)
+                    else:
+                        self.remaining[self.running] += self.time_control.increment
+            self.running = color
+            self._started = now
+
+    def time_left(self, color):
+        with self._lock:
+            left = self.remaining[color]
+            if color == self.running:
+                left -= time.perf_counter() - self._started
+            return left
+
+    def flagged(self):
+        # The side whose time ran out, None while both have time
+        for color in (chess.WHITE, chess.BLACK):
+            if self.time_left(color) <= 0:
+                return color
+        return None
+
+    def limit(self, nodes=None):
+        # UCI only knows Fischer increments. Under Bronstein the engine is told the same increment,
+        # which makes it spend slightly more than it gets back, well within its safety margin.
+        increment = self.time_control.increment
+        return chess.engine.Limit(white_clock=max(self.time_left(chess.WHITE), 0.0),
+                                  black_clock=max(self.time_left(chess.BLACK), 0.0),
+                                  white_inc=increment, black_inc=increment, nodes=nodes)
+
+    @staticmethod
+    def format(seconds):
+        seconds = max(seconds, 0.0)
+        if seconds < 10:
+            return f"0:{seconds:04.1f}"
+        minutes, seconds = divmod(int(seconds), 60)
+        return f"{minutes}:{seconds:02d}"
+
+    def display(self):
+        return (f"White {self.format(self.time_left(chess.WHITE))}  |  "
+                f"Black {self.format(self.time_left(chess.BLACK))}")
+
+def time_forfeit_result(board, color):
+    # Running out of time loses, unless the opponent could never mate
+    if board.has_insufficient_material(not color):
+        return "1/2-1/2"
+    return "0-1" if color == chess.WHITE else "1-0"
+
+def needs_engine(difficulty):
+    # Whether a difficulty plays with an engine process or with the built-in search only
+    return not DIFFICULTY_SETTINGS.get(difficulty, {}).get('builtin')
+
+class BuiltinSearch:
+    """
+    Small in-process search for the low levels: material plus piece-square evaluation, alpha-beta with
+    captures searched until the position is quiet, moves ordered by how much they gain, and a small
+    transposition table kept between moves. Scores are centipawns for the side to move.
+    """
+    VALUES = {chess.PAWN: 100, chess.KNIGHT: 320, chess.BISHOP: 330, chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 0}
+    # Piece-square tables for White, rank 8 first (the "Simplified Evaluation Function")
+    SQUARE_TABLES = {
+        chess.PAWN: (
+            0, 0, 0, 0, 0, 0, 0, 0,
+            50, 50, 50, 50, 50, 50, 50, 50,
+            10, 10, 20, 30, 30, 20, 10, 10,
+            5, 5, 10, 25, 25, 10, 5, 5,
+            0, 0, 0, 20, 20, 0, 0, 0,
+            5, -5, -10, 0, 0, -10, -5, 5,
+            5, 10, 10, -20, -20, 10, 10, 5,
+            0, 0, 0, 0, 0, 0, 0, 0),
+        chess.KNIGHT: (
+            -50, -40, -30, -30, -30, -30, -40, -50,
+            -40, -20, 0, 0, 0, 0, -20, -40,
+            -30, 0, 10, 15, 15, 10, 0, -30,
+            -30, 5, 15, 20, 20, 15, 5, -30,
+            -30, 0, 15, 20, 20, 15, 0, -30,
+            -30, 5, 10, 15, 15, 10, 5, -30,
+            -40, -20, 0, 5, 5, 0, -20, -40,
+            -50, -40, -30, -30, -30, -30, -40, -50),
+        chess.BISHOP: (
+            -20, -10, -10, -10, -10, -10, -10, -20,
+            -10, 0, 0, 0, 0, 0, 0, -10,
+            -10, 0, 5, 10, 10, 5, 0, -10,
+            -10, 5, 5, 10, 10, 5, 5, -10,
+            -10, 0, 10, 10, 10, 10, 0, -10,
+            -10, 10, 10, 10, 10, 10, 10, -10,
+            -10, 5, 0, 0, 0, 0, 5, -10,
+            -20, -10, -10, -10, -10, -10, -10, -20),
+        chess.ROOK: (
+            0, 0, 0, 0, 0, 0, 0, 0,
+            5, 10, 10, 10, 10, 10, 10, 5,
+            -5, 0, 0, 0, 0, 0, 0, -5,
+            -5, 0, 0, 0, 0, 0, 0, -5,
+            -5, 0, 0, 0, 0, 0, 0, -5,
+            -5, 0, 0, 0, 0, 0, 0, -5,
+            -5, 0, 0, 0, 0, 0, 0, -5,
+            0, 0, 0, 5, 5, 0, 0, 0),
+        chess.QUEEN: (
+            -20, -10, -10, -5, -5, -10, -10, -20,
+            -10, 0, 0, 0, 0, 0, 0, -10,
+            -10, 0, 5, 5, 5, 5, 0, -10,
+            -5, 0, 5, 5, 5, 5, 0, -5,
+            0, 0, 5, 5, 5, 5, 0, -5,
+            -10, 5, 5, 5, 5, 5, 0, -10,
+            -10, 0, 5, 0, 0, 0, 0, -10,
+            -20, -10, -10, -5, -5, -10, -10, -20),
+        chess.KING: (
+            -30, -40, -40, -50, -50, -40, -40, -30,
+            -30, -40, -40, -50, -50, -40, -40, -30,
+            -30, -40, -40, -50, -50, -40, -40, -30,
+            -30, -40, -40, -50, -50, -40, -40, -30,
+            -20, -30, -30, -40, -40, -30, -30, -20,
+            -10, -20, -20, -20, -20, -20, -20, -10,
+            20, 20, 0, 0, 0, 0, 20, 20,
+            20, 30, 10, 0, 0, 10, 30, 20),
+    }
+    # Captures that cannot bring the score back within this margin of alpha are not searched
+    DELTA_MARGIN = 200
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    class NodeLimitReached(Exception):
+        pass
+
+    # The clock is read once every this many nodes
+    TIME_CHECK_NODES = 32
+
+    def __init__(self, table_size=BUILTIN_TT_SIZE):
+        self.table_size = table_size
+        self.table = {}  # position hash -> (depth, score, bound, best move)
+        self.nodes = 0
+        self.max_nodes = None
+        self.deadline = None
+        # pieces[color][piece type][square]: value of the piece on the square for its own side
+        self.pieces = {
+            color: {piece_type: [self.VALUES[piece_type] + squares[square ^ 56 if color == chess.WHITE else square]
+                                 for square in chess.SQUARES]
+                    for piece_type, squares in self.SQUARE_TABLES.items()}
+            for color in chess.COLORS}
+
+    def evaluate(self, board):
+        score = 0
+        for square, piece in board.piece_map().items():
+            value = self.pieces[piece.color][piece.piece_type][square]
+            score += value if piece.color == board.turn else -value
+        return score
+
+    def gain(self, board, move):
+        # How much move changes the evaluation for the mover, without playing it
+        color = board.turn
+        own = self.pieces[color]
+        piece_type = board.piece_type_at(move.from_square)
+        gain = own[move.promotion or piece_type][move.to_square] - own[piece_type][move.from_square]
+        if board.is_castling(move):
+            if chess.square_file(move.to_square) == 6:
+                rook_from, rook_to = move.to_square + 1, move.to_square - 1
+            else:
+                rook_from, rook_to = move.to_square - 2, move.to_square + 1
+            gain += own[chess.ROOK][rook_to] - own[chess.ROOK][rook_from]
+        else:
+            captured = board.piece_type_at(move.to_square)
+            if captured:
+                gain += self.pieces[not color][captured][move.to_square]
+            elif piece_type == chess.PAWN and board.is_en_passant(move):
+                gain += self.pieces[not color][chess.PAWN][move.to_square + (-8 if color == chess.WHITE else 8)]
+        return gain
+
+    def search(self, board, depth, max_nodes=None, max_time=None):
+        """
+        Searches board to depth, one iteration per depth so each starts from the previous best move, and
+        returns (best move, info) for the deepest completed iteration. max_nodes and max_time (seconds)
+        end the search early.
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.max_nodes = max_nodes
+        self.deadline = start + max_time if max_time else None
+        # An interrupted search leaves its moves on the copy
+        position = board.copy(stack=False)
+        static = self.evaluate(board)
+        key = chess.polyglot.zobrist_hash(board)
+        best_move, best_score, reached = None, static, 0
+        for current in range(1, depth + 1):
+            try:
+                score = self._negamax(position, current, -2 * MATE_SCORE, 2 * MATE_SCORE, static, 0)
+            except self.NodeLimitReached:
+                break
+            entry = self.table.get(key)
+            if entry is None:
+                # No legal moves, nothing deeper to find
+                break
+            best_score, best_move, reached = score, entry[3], current
+        if best_move is None:
+            # Out of nodes before the first iteration finished: take the move that gains the most
+            moves = list(board.legal_moves)
+            best_move = max(moves, key=lambda move: self.gain(board, move)) if moves else None
+        info = {'score': chess.engine.PovScore(chess.engine.Cp(best_score), board.turn), 'depth': reached,
+                'nodes': self.nodes, 'time': time.perf_counter() - start, 'pv': [best_move] if best_move else []}
+        return best_move, info
+
+    def _count_node(self):
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise self.NodeLimitReached()
+        if (self.deadline is not None and not self.nodes % self.TIME_CHECK_NODES
+                and time.perf_counter() > self.deadline):
+            raise self.NodeLimitReached()
+
+    def _negamax(self, board, depth, alpha, beta, static, ply):
+        if depth <= 0:
+            return self._quiesce(board, alpha, beta, static)
+        self._count_node()
+        key = chess.polyglot.zobrist_hash(board)
+        entry = self.table.get(key)
+        table_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, table_move = entry
+            if ply and entry_depth >= depth and (
+                    bound == self.EXACT or (bound == self.LOWER and entry_score >= beta)
+                    or (bound == self.UPPER and entry_score <= alpha)):
+                return entry_score
+
+        moves = [(self.gain(board, move), move) for move in board.legal_moves]
+        if not moves:
+            return -MATE_SCORE + ply if board.is_check() else 0
+        moves.sort(key=lambda item: (item[1] == table_move, item[0]), reverse=True)
+
+        original_alpha = alpha
+        best_score, best_move = -2 * MATE_SCORE, None
+        for gain, move in moves:
+            # One ply from the leaves the opponent may stand pat, so a move scores at most static + gain.
+            # Moves are sorted by gain, once one cannot reach alpha the rest cannot either.
+            if depth == 1 and best_move is not None and static + gain <= alpha:
+                break
+            board.push(move)
+            score = -self._negamax(board, depth - 1, -beta, -alpha, -(static + gain), ply + 1)
+            board.pop()
+            if score > best_score:
+                best_score, best_move = score, move
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    break
+
+        bound = self.UPPER if best_score <= original_alpha else self.LOWER if best_score >= beta else self.EXACT
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[key] = (depth, best_score, bound, best_move)
+        return best_score
+
+    def _quiesce(self, board, alpha, beta, static):
+        # Only captures from here on; the side to move may also stand pat on the static evaluation
+        self._count_node()
+        if static >= beta:
+            return static
+        alpha = max(alpha, static)
+        captures = sorted(((self.gain(board, move), move) for move in board.generate_legal_captures()),
+                          key=lambda item: item[0], reverse=True)
+        for gain, move in captures:
+            if static + gain + self.DELTA_MARGIN < alpha:
+                break
+            board.push(move)
+            score = -self._quiesce(board, -beta, -alpha, -(static + gain))
+            board.pop()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
 class CustomEngine:
-    def __init__(self, engine, difficulty):
+    def __init__(self, engine, difficulty, book=OPENING_BOOK, latency=MOVE_LATENCY, ponder=False, telemetry=TELEMETRY):
         self.engine = engine
         self.difficulty = difficulty
-
-    def play(self, board):
-        if self.difficulty == "Super Duper Easy":
-            # Always play a random move
-            return random.choice(list(board.legal_moves))
-        elif self.difficulty == "Easy":
-            # 70% chance to play a random move
-            if random.random() < 0.7:
-                return random.choice(list(board.legal_moves))
-            else:
-                return self.engine.play(board, chess.engine.Limit(depth=1)).move
-        elif self.difficulty == "Medium":
-            # 50% chance to play a random move
-            if random.random() < 0.5:
-                return random.choice(list(board.legal_moves))
+        self.book = book
+        self.latency = latency
+        self.telemetry = telemetry
+        self.ponder = ponder and DIFFICULTY_SETTINGS.get(difficulty, {}).get('ponder', False)
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        # Position the engine is pondering on, after its move and the expected reply, and the engine's
+        # command count when the ponder search started
+        self._ponder_board = None
+        self._ponder_commands = None
+        self._ponder_timer = None
+        self._ponder_lock = threading.Lock()
+        self.builtin = BuiltinSearch()
+        # Time taken by the last move and the search info behind it (None for random and book moves)
+        self.last_move_time = None
+        self.last_info = None
+
+    def play(self, board, cancel=None, clock=None):
+        # With a clock the engine is given both sides' remaining time and manages its own
+        start = time.perf_counter()
+        move, info = self._choose_move(board, cancel, clock)
+        self.last_move_time = time.perf_counter() - start
+        self.last_info = info
+        name = self.engine.name if needs_engine(self.difficulty) else BUILTIN_ENGINE_NAME
+        self.latency.record((name, self.difficulty), self.last_move_time)
+        if info is not None and self.telemetry is not None:
+            self.telemetry.record(name, self.difficulty, 'move', board, move, info, self.last_move_time)
+        return move
+
+    def _take_ponder(self):
+        # Hands over the running ponder search, if any, and stops its timeout
+        with self._ponder_lock:
+            pondering = (self._ponder_board, self._ponder_commands)
+            self._ponder_board = self._ponder_commands = None
+            if self._ponder_timer is not None:
+                self._ponder_timer.cancel()
+                self._ponder_timer = None
+        return pondering
+
+    def _choose_move(self, board, cancel=None, clock=None):
+        # Returns (move, search info), the info is None when no search was needed
+        pondering = self._take_ponder()
+
+        # A book hit skips the engine entirely
+        if self.book is not None:
+            move = self.book.choose(board, OPENING_BOOK_PLIES.get(self.difficulty, 0))
+            if move is not None:
+                self._abandon_ponder(pondering)
+                return move, None
+
+        # Every level is bounded by time and nodes, so a move costs about the same on any engine
+        settings = DIFFICULTY_SETTINGS[self.difficulty]
+        if random.random() < settings['random']:
+            self._abandon_ponder(pondering)
+            return random.choice(list(board.legal_moves)), None
+        if settings.get('builtin'):
+            # The low levels search in-process and never start the engine
+            self._abandon_ponder(pondering)
+            move, info = self.builtin.search(board, settings['builtin'], settings.get('nodes'), settings.get('time'))
+            if cancel is not None and cancel.is_cancelled():
+                raise SearchCancelled()
+            return move, info
+        self.engine.configure(strength_options(self.engine, self.difficulty))
+        # On a clock the level's node budget still caps the search, the move time is up to the engine
+        limit = clock.limit(nodes=settings['nodes']) if clock is not None else difficulty_limit(self.difficulty)
+        if self.ponder:
+            result = self._play_and_ponder(board, limit, cancel, pondering)
+        else:
+            result = self.engine.play(board, limit, cancel=cancel, info=EngineTelemetry.INFO)
+        return result.move, result.info
+
+    def _abandon_ponder(self, pondering):
+        # A move chosen without the engine would leave the ponder search running
+        if pondering[0] is not None:
+            self.ponder_misses += 1
+            self.engine.ping()
+
+    def _play_and_ponder(self, board, limit, cancel=None, pondering=(None, None)):
+        # The engine keeps searching the expected reply after answering. If the next request is for that
+        # position, with the same move history and no engine command in between (a hint, a changed
+        # option), python-chess sends a ponderhit. Otherwise the next command stops the ponder search.
+        # Cancelling sends the engine a command, which stops the play command's search.
+        ponder_board, commands = pondering
+        if ponder_board is not None:
+            if (commands == self.engine.commands and board == ponder_board
+                    and board.move_stack == ponder_board.move_stack):
+                self.ponder_hits += 1
             else:
-                return self.engine.play(board, chess.engine.Limit(depth=5)).move
-        elif self.difficulty == "Hard":
-            # Use engine's move but limit the depth
-            return self.engine.play(board, chess.engine.Limit(depth=10)).move
+                self.ponder_misses += 1
+        if cancel is None:
+            result = self.engine.play(board, limit, ponder=True, game=self, info=EngineTelemetry.INFO)
         else:
-            # 'Impossible' difficulty - use engine's best move
-            return self.engine.play(board, chess.engine.Limit(time=0.1)).move
+            stopped = threading.Event()
 
-    def analyse(self, board, limit):
+            def stop():
+                try:
+                    self.engine.ping()
+                except Exception:
+                    pass  # The engine is gone, nothing left to stop
+                finally:
+                    stopped.set()
+
+            try:
+                with cancel.track(self.engine, stop=stop):
+                    if cancel.is_cancelled():
+                        raise SearchCancelled()
+                    result = self.engine.play(board, limit, ponder=True, game=self, info=EngineTelemetry.INFO)
+            except concurrent.futures.CancelledError:
+                # python-chess cancels a play command as soon as another command arrives. The next
+                # command must wait until that one has finished, or they would cancel each other.
+                if not cancel.is_cancelled():
+                    raise
+                stopped.wait()
+                raise SearchCancelled()
+        if result.move is not None and result.ponder is not None:
+            position = board.copy()
+            position.push(result.move)
+            position.push(result.ponder)
+            with self._ponder_lock:
+                self._ponder_board = position
+                self._ponder_commands = self.engine.commands
+                # A human who takes long to move should not keep a core busy the whole time
+                self._ponder_timer = threading.Timer(PONDER_TIMEOUT, self.stop_pondering)
+                self._ponder_timer.daemon = True
+                self._ponder_timer.start()
+        if cancel is not None and cancel.is_cancelled():
+            # Cancelled after the move was found, the ponder search is left to its timeout
+            raise SearchCancelled()
+        return result
+
+    def stop_pondering(self):
+        # Holding the lock makes the next move wait for the ping, two commands sent at once from
+        # different threads would cancel each other
+        with self._ponder_lock:
+            pondering = self._ponder_board is not None
+            self._ponder_board = self._ponder_commands = None
+            if self._ponder_timer is not None:
+                self._ponder_timer.cancel()
+                self._ponder_timer = None
+            if pondering:
+                # Any new command stops the ponder search
+                self.engine.ping()
+
+    def ponder_report(self):
+        total = self.ponder_hits + self.ponder_misses
+        if not total:
+            return "Ponder hits: -"
+        return f"Ponder hits: {self.ponder_hits}/{total} ({100.0 * self.ponder_hits / total:.0f}%)"
+
+    def analyse(self, board, limit, cancel=None):
         # For hints, always use the best possible move
-        return self.engine.analyse(board, limit)
+        self.engine.configure(strength_options(self.engine, "Impossible"))
+        start = time.perf_counter()
+        info = self.engine.analyse(board, limit, cancel=cancel)
+        if self.telemetry is not None:
+            move = info['pv'][0] if info.get('pv') else None
+            self.telemetry.record(self.engine.name, self.difficulty, 'hint', board, move, info, time.perf_counter() - start)
+        return info
 
     def quit(self):
         self.engine.quit()
 
-def get_engines():
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    ENGINE_FOLDER_PATH = os.path.join(BASE_DIR, 'engines')
-    engines = {
-        'LC0': chess.engine.SimpleEngine.popen_uci(os.path.join(ENGINE_FOLDER_PATH, 'lc0-v0.30.0-windows-cpu-openblas', 'lc0.exe')),
-        'Stockfish': chess.engine.SimpleEngine.popen_uci(os.path.join(ENGINE_FOLDER_PATH, 'stockfish', 'stockfish-windows-x86-64-avx2.exe')),
-        'Komodo': chess.engine.SimpleEngine.popen_uci(os.path.join(ENGINE_FOLDER_PATH, 'komodo-14', 'Windows', 'komodo-14.1-64bit.exe')),
-    }
-    engines['LC0'].configure({'WeightsFile': os.path.join(ENGINE_FOLDER_PATH, 'lc0-v0.30.0-windows-cpu-openblas', 't1-256x10-distilled-swa-2432500.pb.gz')})
+class AnalysisCache:
+    """
+    Bounded LRU cache of single-PV analysis results, keyed by position hash.
+    A result from an equal or deeper search is reused for shallower requests.
+    """
+    def __init__(self, max_size=ANALYSIS_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()  # position hash -> list of (limit, info)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_cacheable(limit):
+        # Clock based or mate searches depend on more than the position
+        return (limit.mate is None and limit.white_clock is None and limit.black_clock is None
+                and (limit.time is not None or limit.depth is not None or limit.nodes is not None))
+
+    @staticmethod
+    def covers(cached_limit, info, limit):
+        for field in ('time', 'depth', 'nodes'):
+            wanted = getattr(limit, field)
+            if wanted is None:
+                continue
+            # The engine may report slightly less than it was asked for (e.g. 0.098s for time=0.1)
+            searched = [value for value in (info.get(field), getattr(cached_limit, field)) if value is not None]
+            if not searched or max(searched) < wanted:
+                return False
+        return True
+
+    def get(self, board, limit, variant=None):
+        # variant separates results of differently configured instances of the same engine
+        key = (chess.polyglot.zobrist_hash(board), variant)
+        with self._lock:
+            for cached_limit, info in self._entries.get(key, ()):
+                if self.covers(cached_limit, info, limit):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(info)
+            self.misses += 1
+        return None
+
+    def put(self, board, limit, info, variant=None):
+        key = (chess.polyglot.zobrist_hash(board), variant)
+        with self._lock:
+            entries = self._entries.setdefault(key, [])
+            # Keep only results that are not made redundant by the new one
+            entries[:] = [(cached_limit, cached_info) for cached_limit, cached_info in entries
+                          if not self.covers(limit, info, cached_limit)]
+            entries.append((limit, info))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        total = self.hits + self.misses
+        hit_rate = 100.0 * self.hits / total if total else 0.0
+        return f"{self.hits} hits / {self.misses} misses ({hit_rate:.0f}%), {len(self)} entries"
+
+class EvalStore:
+    """
+    SQLite store of analysis results keyed by position hash, engine identity and search limit, with the
+    depth, score and principal variation of each search. Like the AnalysisCache, a stored result from an
+    equal or deeper search answers shallower requests. The database runs in WAL mode so readers in other
+    processes do not block the writer.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS evals (
+            position INTEGER NOT NULL,
+            engine TEXT NOT NULL,
+            search TEXT NOT NULL,
+            limit_time REAL,
+            limit_depth INTEGER,
+            limit_nodes INTEGER,
+            depth INTEGER,
+            seldepth INTEGER,
+            time REAL,
+            nodes INTEGER,
+            score_cp INTEGER,
+            score_mate INTEGER,
+            pv TEXT NOT NULL,
+            created REAL NOT NULL,
+            PRIMARY KEY (position, engine, search)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS evals_created ON evals (created);
+    """
+    COLUMNS = ('position', 'engine', 'search', 'limit_time', 'limit_depth', 'limit_nodes', 'depth', 'seldepth',
+               'time', 'nodes', 'score_cp', 'score_mate', 'pv', 'created')
+
+    def __init__(self, path, batch_size=EVAL_STORE_BATCH_SIZE, flush_interval=EVAL_STORE_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._pid = None
+        self._pending = {}  # primary key -> row, not yet committed
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Opened on first use and again in forked worker processes, which must not share the parent's connection
+        if self._connection is None or self._pid != os.getpid():
+            self._pending = {}
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def position_key(board):
+        # SQLite integers are signed 64 bit
+        key = chess.polyglot.zobrist_hash(board)
+        return key - (1 << 64) if key >= 1 << 63 else key
+
+    @staticmethod
+    def search_key(limit):
+        return f"time={limit.time} depth={limit.depth} nodes={limit.nodes}"
+
+    def _info(self, board, row):
+        limit_time, limit_depth, limit_nodes, depth, seldepth, seconds, nodes, score_cp, score_mate, pv = row
+        # A hash collision or a corrupt row shows up as an illegal principal variation
+        moves = []
+        position = board.copy(stack=False)
+        for uci in pv.split():
+            try:
+                move = chess.Move.from_uci(uci)
+            except ValueError:
+                return None, None
+            if not position.is_legal(move):
+                return None, None
+            moves.append(move)
+            position.push(move)
+        if score_mate is not None:
+            score = chess.engine.MateGiven if score_mate == 0 else chess.engine.Mate(score_mate)
+        else:
+            score = chess.engine.Cp(score_cp)
+        info = {'score': chess.engine.PovScore(score, board.turn), 'pv': moves}
+        for key, value in (('depth', depth), ('seldepth', seldepth), ('time', seconds), ('nodes', nodes)):
+            if value is not None:
+                info[key] = value
+        return chess.engine.Limit(time=limit_time, depth=limit_depth, nodes=limit_nodes), info
+
+    def _rows(self, board, engine):
+        position = self.position_key(board)
+        rows = self._connect().execute(
+            "SELECT limit_time, limit_depth, limit_nodes, depth, seldepth, time, nodes, score_cp, score_mate, pv "
+            "FROM evals WHERE position = ? AND engine = ?", (position, engine)).fetchall()
+        rows += [row[3:13] for key, row in self._pending.items() if key[:2] == (position, engine)]
+        return rows
+
+    def get(self, board, limit, engine):
+        """
+        Returns the deepest stored result for the position that covers limit, or None.
+        """
+        with self._lock:
+            best = None
+            try:
+                rows = self._rows(board, engine)
+            except (sqlite3.Error, OSError):
+                # The store is only a cache, the engine answers if it cannot be read
+                rows = []
+            for row in rows:
+                stored_limit, info = self._info(board, row)
+                if info is None or not AnalysisCache.covers(stored_limit, info, limit):
+                    continue
+                if best is None or info.get('depth', 0) > best.get('depth', 0):
+                    best = info
+            if best is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return best
+
+    def best(self, board, engine):
+        # The deepest stored result for the position, whatever its limit
+        return self.get(board, chess.engine.Limit(), engine)
+
+    def put(self, board, limit, info, engine):
+        if not info.get('pv') or 'score' not in info:
+            return
+        score = info['score'].relative
+        row = (self.position_key(board), engine, self.search_key(limit), limit.time, limit.depth, limit.nodes,
+               info.get('depth'), info.get('seldepth'), info.get('time'), info.get('nodes'),
+               score.score(), score.mate(), " ".join(move.uci() for move in info['pv']), time.time())
+        with self._lock:
+            try:
+                self._connect()
+                self._pending[row[:3]] = row
+                if (len(self._pending) >= self.batch_size
+                        or time.monotonic() - self._last_flush >= self.flush_interval):
+                    self._flush()
+            except (sqlite3.Error, OSError):
+                self._pending = {}
+
+    def _flush(self):
+        if self._pending and self._pid == os.getpid():
+            with self._connection:
+                self._connection.executemany(
+                    f"INSERT OR REPLACE INTO evals ({', '.join(self.COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(self.COLUMNS))})", list(self._pending.values()))
+        self._pending = {}
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            if self._connection is not None:
+                self._flush()
+
+    def prune(self, max_age_days=None, max_size_mb=None):
+        """
+        Deletes results older than max_age_days, then the oldest results until the database fits in
+        max_size_mb, and compacts the file. Returns the number of deleted results.
+        """
+        with self._lock:
+            connection = self._connect()
+            self._flush()
+            deleted = 0
+            with connection:
+                if max_age_days is not None:
+                    cutoff = time.time() - max_age_days * 86400
+                    deleted += connection.execute("DELETE FROM evals WHERE created < ?", (cutoff,)).rowcount
+                if max_size_mb is not None:
+                    size = self._size(connection)
+                    count = connection.execute("SELECT COUNT(*) FROM evals").fetchone()[0]
+                    limit = max_size_mb * 1024 * 1024
+                    if size > limit and count:
+                        # Rows are about the same size, so drop the oldest share that is over the limit
+                        excess = int(count * (1 - limit / size)) + 1
+                        deleted += connection.execute(
+                            "DELETE FROM evals WHERE (position, engine, search) IN "
+                            "(SELECT position, engine, search FROM evals ORDER BY created LIMIT ?)", (excess,)).rowcount
+            connection.execute("VACUUM")
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return deleted
+
+    @staticmethod
+    def _size(connection):
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    def summary(self):
+        with self._lock:
+            connection = self._connect()
+            self._flush()
+            count, oldest = connection.execute("SELECT COUNT(*), MIN(created) FROM evals").fetchone()
+            return {'results': count, 'size_mb': round(self._size(connection) / (1024 * 1024), 2),
+                    'oldest': time.strftime('%Y-%m-%d %H:%M', time.localtime(oldest)) if oldest else None}
+
+    def stats(self):
+        total = self.hits + self.misses
+        hit_rate = 100.0 * self.hits / total if total else 0.0
+        return f"{self.hits} hits / {self.misses} misses ({hit_rate:.0f}%)"
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                try:
+                    self._flush()
+                finally:
+                    self._connection.close()
+            self._connection = None
+
+EVAL_STORE = EvalStore(EVAL_STORE_PATH)
+
+class LazyEngine:
+    """
+    Wraps a UCI engine process that is started in the background and only waited on when first used.
+    """
+    def __init__(self, name, path, options=None, executor=None, warmup_time=0, analysis_cache=None, eval_store=EVAL_STORE,
+                 resources=None):
+        self.name = name
+        self.path = path
+        self.base_config = dict(options or {})
+        self.config = dict(self.base_config)
+        # Memory settings such as Hash, applied at every launch if the engine has them
+        self.resources = dict(resources or {})
+        self.last_used = time.monotonic()
+        self.idle_stopped = False
+        # Commands sent to the engine so far. Every command ends a running ponder search.
+        self.commands = 0
+        self.warmup_time = warmup_time
+        self.startup_time = None
+        self.error = None
+        self._executor = executor
+        self._future = None
+        self._lock = threading.Lock()
+        self.analysis_cache = analysis_cache if analysis_cache is not None else AnalysisCache()
+        self.eval_store = eval_store
+        self._binary_stamp = None
+
+    def _launch(self):
+        start = time.perf_counter()
+        self.error = None
+        try:
+            engine = chess.engine.SimpleEngine.popen_uci(self.path)
+            resources = {name: value for name, value in self.resources.items() if name in engine.options}
+            if resources or self.config:
+                engine.configure({**resources, **self.config})
+            if self.warmup_time:
+                # A short search so the first real request does not pay for hash/network allocation
+                engine.analyse(chess.Board(), chess.engine.Limit(time=self.warmup_time))
+        except Exception as e:
+            self.error = e
+            raise
+        self.startup_time = time.perf_counter() - start
+        # The idle timeout counts from when the engine is ready, a slow start is not idle time
+        self.touch()
+        return engine
+
+    def start(self):
+        with self._lock:
+            if self._future is None:
+                self.idle_stopped = False
+                self.touch()
+                if self._executor is not None:
+                    self._future = self._executor.submit(self._launch)
+                else:
+                    self._future = concurrent.futures.Future()
+                    try:
+                        self._future.set_result(self._launch())
+                    except Exception as e:
+                        self._future.set_exception(e)
+            return self._future
+
+    def is_started(self):
+        return self._future is not None
+
+    def is_starting(self):
+        future = self._future
+        return future is not None and not future.done()
+
+    def is_ready(self):
+        return self._future is not None and self._future.done() and self.error is None
+
+    @property
+    def engine(self):
+        return self.start().result()
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+    def idle_time(self):
+        return time.monotonic() - self.last_used
+
+    def memory(self):
+        # Resident memory of the engine process in bytes, None if it is not running or cannot be read
+        if not self.is_ready():
+            return None
+        try:
+            pid = self.engine.transport.get_pid()
+        except Exception:
+            return None
+        return process_memory(pid)
+
+    def _search(self, board, limit, cancel, **kwargs):
+        # Runs the search through the analysis API so it can be stopped from another thread
+        self.commands += 1
+        with self.engine.analysis(board, limit, **kwargs) as analysis:
+            with cancel.track(analysis):
+                best = analysis.wait()
+        if cancel.is_cancelled():
+            raise SearchCancelled()
+        return best, analysis.info
+
+    def play(self, board, limit, cancel=None, **kwargs):
+        self.touch()
+        if not kwargs and AnalysisCache.is_cacheable(limit):
+            # A plain search for the best move is an analysis, which the caches may already know
+            info = self.analyse(board, limit, cancel=cancel)
+            if info.get('pv'):
+                pv = info['pv']
+                return chess.engine.PlayResult(pv[0], pv[1] if len(pv) > 1 else None, info)
+        if cancel is None:
+            self.commands += 1
+            return self.engine.play(board, limit, **kwargs)
+        if 'UCI_AnalyseMode' in self.engine.options:
+            # The analysis API behind cancellable searches switches analysis mode on, play() keeps it off
+            kwargs['options'] = {**kwargs.get('options', {}), 'UCI_AnalyseMode': False}
+        best, info = self._search(board, limit, cancel, **kwargs)
+        return chess.engine.PlayResult(best.move, best.ponder, info)
+
+    def analyse(self, board, limit, cancel=None, **kwargs):
+        # Only plain single-PV searches are cached, anything with extra options goes straight to the engine.
+        # The in-memory cache is checked first, then the on-disk store.
+        self.touch()
+        cacheable = not kwargs and AnalysisCache.is_cacheable(limit)
+        variant = self.options_key()
+        if cacheable:
+            info = self.analysis_cache.get(board, limit, variant)
+            if info is not None:
+                return info
+            if self.eval_store is not None:
+                info = self.eval_store.get(board, limit, self.identity())
+                if info is not None:
+                    self.analysis_cache.put(board, limit, info, variant)
+                    return info
+        if cancel is None:
+            self.commands += 1
+            info = self.engine.analyse(board, limit, **kwargs)
+        else:
+            _, info = self._search(board, limit, cancel, **kwargs)
+        if cacheable:
+            self.analysis_cache.put(board, limit, info, variant)
+            if self.eval_store is not None:
+                self.eval_store.put(board, limit, info, self.identity())
+        return info
+
+    def identity(self):
+        """
+        Identifies the engine build and settings behind a stored result: the engine name, the executable's
+        size and modification time (so an upgraded engine does not reuse old results) and its options.
+        """
+        if self._binary_stamp is None:
+            executable = self.path if isinstance(self.path, str) else next(
+                (part for part in reversed(self.path) if os.path.isfile(part)), self.path[0])
+            try:
+                stat = os.stat(executable)
+                self._binary_stamp = f"{stat.st_size}:{int(stat.st_mtime)}"
+            except OSError:
+                self._binary_stamp = "?"
+        return f"{self.name}|{self._binary_stamp}|{json.dumps(self.options_key())}"
+
+    def stored_analysis(self, board):
+        # The deepest stored result for the position, whatever search produced it
+        if self.eval_store is None:
+            return None
+        return self.eval_store.best(board, self.identity())
+
+    def store_analysis(self, board, info):
+        # Keeps the result of an open-ended search under the depth it reached
+        if self.eval_store is not None and info.get('depth'):
+            self.eval_store.put(board, chess.engine.Limit(depth=info['depth']), info, self.identity())
+
+    def analysis(self, board, limit=None, **kwargs):
+        self.touch()
+        self.commands += 1
+        return self.engine.analysis(board, limit, **kwargs)
+
+    def ping(self):
+        self.commands += 1
+        self.engine.ping()
+
+    def options_key(self):
+        """
+        The settings that affect search results, so an eval found at full strength is shared by every
+        caller whatever options an earlier game left on the instance. Options that only affect speed,
+        a switched-off strength limit and options at their default value are left out.
+        """
+        config = {name: value for name, value in self.config.items() if name not in EVAL_NEUTRAL_OPTIONS}
+        if str(config.get('UCI_LimitStrength', False)).lower() == 'false':
+            config.pop('UCI_LimitStrength', None)
+            config.pop('UCI_Elo', None)
+        if self.is_ready():
+            # Strength options are only ever set on a running engine, so their defaults are known here
+            available = self.engine.options
+            for name in list(config):
+                option = available.get(name)
+                if option is not None and (config[name] == option.default
+                                           or (name == 'Skill Level' and config[name] == option.max)):
+                    del config[name]
+        return tuple(sorted((name, str(value)) for name, value in config.items()))
+
+    def configure(self, options):
+        # Only changed options are sent, any engine command would interrupt a ponder search
+        changes = {name: value for name, value in options.items() if self.config.get(name) != value}
+        self.config.update(changes)
+        if changes and self.is_started():
+            self.commands += 1
+            self.engine.configure(changes)
+
+    def set_options(self, options=None):
+        """
+        Configures the instance with its base options plus options, undoing anything a previous user set.
+        """
+        desired = {**self.base_config, **(options or {})}
+        changes = {name: value for name, value in desired.items() if self.config.get(name) != value}
+        if self.is_started():
+            engine = self.engine
+            for name in self.config:
+                if name not in desired and name in engine.options:
+                    changes[name] = engine.options[name].default
+        self.config = desired
+        if changes and self.is_started():
+            self.commands += 1
+            self.engine.configure(changes)
+
+    def status(self):
+        if self._future is None:
+            return f"stopped while idle ({self.idle_time():.0f}s unused)" if self.idle_stopped else "not started"
+        if not self._future.done():
+            return "starting..."
+        if self.error is not None:
+            return f"failed: {self.error}"
+        memory = self.memory()
+        return f"ready in {self.startup_time:.2f}s" + (f", {format_memory(memory)}" if memory is not None else "")
+
+    def quit(self):
+        with self._lock:
+            future, self._future = self._future, None
+        if future is None:
+            return
+        try:
+            engine = future.result()
+        except Exception:
+            return
+        engine.quit()
+
+class EnginePool:
+    """
+    Hands out independent instances (processes) of one engine type, at most max_size at a time.
+    Released instances are kept and reused by the next game. All instances share one analysis cache.
+    """
+    def __init__(self, name, path, options=None, executor=None, warmup_time=0, max_size=ENGINE_POOL_SIZE, eval_store=EVAL_STORE,
+                 resources=None):
+        self.name = name
+        self.path = path
+        self.options = dict(options or {})
+        self.resources = dict(resources or {})
+        self.max_size = max_size
+        self.warmup_time = warmup_time
+        self.analysis_cache = AnalysisCache()
+        self.eval_store = eval_store
+        self.instances = []
+        self._executor = executor
+        self._idle = []
+        self._condition = threading.Condition()
+
+    def _new_instance(self):
+        instance = LazyEngine(self.name, self.path, self.options, executor=self._executor,
+                              warmup_time=self.warmup_time, analysis_cache=self.analysis_cache,
+                              eval_store=self.eval_store, resources=self.resources)
+        self.instances.append(instance)
+        return instance
+
+    def start(self):
+        # Makes sure an idle instance is starting so the next acquire() does not wait for it
+        with self._condition:
+            if not self._idle and len(self.instances) < self.max_size:
+                self._idle.append(self._new_instance())
+            candidates = self._idle or self.instances
+            instance = next((instance for instance in candidates if instance.is_started()), candidates[0])
+        return instance.start()
+
+    def is_started(self):
+        return any(instance.is_started() for instance in self.instances)
+
+    def is_starting(self):
+        return any(instance.is_starting() for instance in self.instances)
+
+    def acquire(self, options=None, timeout=None):
+        with self._condition:
+            while not self._idle and len(self.instances) >= self.max_size:
+                if not self._condition.wait(timeout):
+                    raise RuntimeError(f"All {self.max_size} {self.name} instances are in use.")
+            if self._idle:
+                # Prefer an instance that is already running
+                self._idle.sort(key=lambda instance: instance.is_started())
+                instance = self._idle.pop()
+            else:
+                instance = self._new_instance()
+        instance.set_options(options)
+        return instance
+
+    def release(self, instance):
+        instance.touch()
+        with self._condition:
+            if instance in self.instances and instance not in self._idle:
+                self._idle.append(instance)
+                self._condition.notify()
+
+    @contextlib.contextmanager
+    def instance(self, options=None):
+        instance = self.acquire(options)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def status(self):
+        if not self.instances:
+            return "not started"
+        in_use = len(self.instances) - len(self._idle)
+        statuses = ", ".join(instance.status() for instance in self.instances)
+        return f"{len(self.instances)} instance(s), {in_use} in use: {statuses}"
+
+    def memory(self):
+        # Resident memory of all running instances in bytes
+        return sum(instance.memory() or 0 for instance in self.instances)
+
+    def stop_idle(self, timeout=ENGINE_IDLE_TIMEOUT, memory_limit_mb=ENGINE_MEMORY_LIMIT_MB):
+        """
+        Shuts down released instances that have not been used for timeout seconds or that hold more than
+        memory_limit_mb of memory. They stay in the pool and start again on their next use.
+        Returns the number of instances stopped.
+        """
+        stopping = []
+        with self._condition:
+            for instance in self._idle:
+                if not instance.is_ready():
+                    continue
+                idle = timeout and instance.idle_time() > timeout
+                memory = instance.memory() if memory_limit_mb else None
+                if idle or (memory is not None and memory > memory_limit_mb * 2**20):
+                    stopping.append(instance)
+            # Out of the idle list acquire() cannot hand them out while they shut down
+            self._idle = [instance for instance in self._idle if instance not in stopping]
+        try:
+            for instance in stopping:
+                instance.quit()
+                instance.idle_stopped = True
+        finally:
+            with self._condition:
+                self._idle.extend(stopping)
+                self._condition.notify_all()
+        return len(stopping)
+
+    def quit(self):
+        for instance in self.instances:
+            instance.quit()
+
+def process_memory(pid):
+    """
+    Resident memory of a process in bytes, or None when it cannot be read.
+    """
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def format_memory(size):
+    return f"{size / 2**20:.0f} MB"
+
+class EngineGovernor:
+    """
+    Checks the engine pools every interval seconds and stops instances that have been idle for longer
+    than timeout or that grew past memory_limit_mb, so an app left open does not keep several engine
+    processes resident. on_stop(names) is called with the engines that had instances stopped.
+    """
+    def __init__(self, engines, timeout=ENGINE_IDLE_TIMEOUT, interval=ENGINE_IDLE_CHECK_INTERVAL,
+                 memory_limit_mb=ENGINE_MEMORY_LIMIT_MB, on_stop=None):
+        self.engines = engines
+        self.timeout = timeout
+        self.interval = interval
+        self.memory_limit_mb = memory_limit_mb
+        self.on_stop = on_stop
+        self.errors = {}  # engine name -> last error while stopping its instances
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not (self.timeout or self.memory_limit_mb) or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='engine-governor', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.check()
+
+    def check(self):
+        stopped = []
+        for name, engine in self.engines.items():
+            try:
+                if engine.stop_idle(self.timeout, self.memory_limit_mb):
+                    stopped.append(name)
+            except Exception as e:
+                # Shown in the Engine Status window
+                self.errors[name] = e
+        if stopped and self.on_stop is not None:
+            self.on_stop(stopped)
+        return stopped
+
+    def report(self):
+        memory = sum(engine.memory() for engine in self.engines.values())
+        timeout = f"after {self.timeout}s idle" if self.timeout else "never"
+        report = f"Engine memory: {format_memory(memory)} resident, unused engines stop {timeout}"
+        for name, error in self.errors.items():
+            report += f"\n    {name}: could not stop idle instances: {error}"
+        return report
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+def get_engines(preload=ENGINE_PRELOAD, warmup_time=ENGINE_WARMUP_TIME):
+    # Engines are launched concurrently; anything not preloaded starts on first selection or first use
+    pool_sizes = {name: config.get('max_instances', ENGINE_POOL_SIZE) for name, config in ENGINE_CONFIGS.items()}
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=sum(pool_sizes.values()), thread_name_prefix='engine-start')
+    engines = {}
+    for name, config in ENGINE_CONFIGS.items():
+        engines[name] = EnginePool(name, config['path'], config['options'], executor=executor,
+                                   warmup_time=warmup_time, max_size=pool_sizes[name],
+                                   resources=config.get('resources'))
+        if name in preload:
+            engines[name].start()
     return engines
 
+def engine_status_report(engines, governor=None):
+    report = "\n".join(f"{name}: {engine.status()}\n    Analysis cache: {engine.analysis_cache.stats()}"
+                       for name, engine in engines.items())
+    report += f"\nEval store: {EVAL_STORE.stats()}"
+    if governor is not None:
+        report += f"\n{governor.report()}"
+    return f"{report}\n\nMove times:\n{MOVE_LATENCY.report()}\n\nEngine searches:\n{TELEMETRY.report()}"
+
+def format_score(score):
+    # Engine score from White's point of view, e.g. +0.35 or #-3
+    score = score.white()
+    if score.is_mate():
+        return f"#{score.mate()}"
+    return f"{score.score() / 100:+.2f}"
+
+class InfiniteAnalysis:
+    """
+    Streams an open-ended MultiPV search of one position and posts a text summary of it to a window
+    under event_key, at most refresh_rate times a second. follow() restarts the search whenever the
+    position changes and resume() restarts it after another search on the same engine interrupted it.
+    """
+    # Only what the panel shows, so the engine output needs as little parsing as possible
+    INFO = chess.engine.INFO_BASIC | chess.engine.INFO_SCORE | chess.engine.INFO_PV
+
+    def __init__(self, window, event_key='-ANALYSIS-INFO-', refresh_rate=ANALYSIS_REFRESH_RATE):
+        self.window = window
+        self.event_key = event_key
+        self.refresh_rate = refresh_rate
+        self.enabled = False
+        self.engine = None
+        self.multipv = 1
+        self.fen = None
+        self.lines = {}
+        self._analysis = None
+        self._thread = None
+        # Bumped by every start() and stop(), so a search thread that outlived its stop() is ignored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def start(self, engine, board, multipv=1):
+        self.stop()
+        generation = self._generation
+        self.enabled = True
+        self.engine = engine
+        self.multipv = multipv
+        self.fen = board.fen()
+        self.lines = {}
+        position = board.copy()
+        # A stored result is shown, and answers best_move(), until the engine has something to say
+        stored = engine.stored_analysis(position)
+        if stored is not None:
+            self.lines = {1: stored}
+            self.window.write_event_value(self.event_key, (self.fen, "Stored " + self._format(position, stored, self.lines)))
+        try:
+            self._analysis = engine.analysis(position, multipv=multipv if multipv > 1 else None, info=self.INFO)
+        except Exception as e:
+            self.enabled = False
+            self.window.write_event_value(self.event_key, (self.fen, f"Analysis could not start: {e}"))
+            return
+        self._thread = threading.Thread(target=self._run, args=(engine, self._analysis, position, stored, generation),
+                                        daemon=True, name='infinite-analysis')
+        self._thread.start()
+
+    def follow(self, board):
+        if self.enabled and board.fen() != self.fen:
+            if has_both_kings(board):
+                self.start(self.engine, board, self.multipv)
+            else:
+                # Nothing to analyse until the position is valid again
+                self.stop()
+                self.fen = board.fen()
+
+    def resume(self, board):
+        # Analyze, Hint and autoplay searches on the same engine end the infinite search
+        if self.enabled and self._thread is not None and not self._thread.is_alive() and has_both_kings(board):
+            self.start(self.engine, board, self.multipv)
+
+    def _publish(self, generation, lines, text):
+        # Updates from a search that has since been stopped or restarted are dropped
+        with self._lock:
+            if generation != self._generation:
+                return False
+            if lines is not None:
+                self.lines = dict(lines)
+            if text is not None:
+                self.window.write_event_value(self.event_key, (self.fen, text))
+            return True
+
+    def _run(self, engine, analysis, position, stored=None, generation=0):
+        stats = {}
+        lines = dict(self.lines)
+        last_post = 0.0
+        try:
+            for info in analysis:
+                stats.update({key: info[key] for key in ('depth', 'seldepth', 'nodes', 'nps', 'time') if key in info})
+                # A stored line stays up until the search is as deep
+                if 'pv' in info and 'score' in info and (stored is None or info.get('depth', 0) >= stored.get('depth', 0)):
+                    stored = None
+                    lines[info.get('multipv', 1)] = info
+                now = time.perf_counter()
+                if now - last_post >= 1.0 / self.refresh_rate:
+                    last_post = now
+                    if not self._publish(generation, lines, self._format(position, stats, lines)):
+                        return
+        except Exception as e:
+            self._publish(generation, None, f"Analysis stopped: {e}")
+            return
+        # Still current after the search ended means something else stopped it, not stop()
+        self._publish(generation, lines, f"Analysis paused while the engine searches...\n{self._format(position, stats, lines)}")
+        if stored is None and 1 in lines:
+            try:
+                engine.store_analysis(position, lines[1])
+            except Exception:
+                pass
+
+    @staticmethod
+    def _format(position, stats, lines):
+        text = [f"Depth {stats.get('depth', 0)}/{stats.get('seldepth', 0)}   "
+                f"{stats.get('nps', 0) / 1000:.0f} kN/s   {stats.get('nodes', 0):,} nodes"]
+        for number in sorted(lines):
+            info = lines[number]
+            try:
+                line = position.variation_san(info['pv'][:ANALYSIS_PV_LENGTH])
+            except ValueError:
+                line = " ".join(move.uci() for move in info['pv'][:ANALYSIS_PV_LENGTH])
+            text.append(f"{number}. {format_score(info['score'])}  {line}")
+        return "\n".join(text)
+
+    def best_move(self, board):
+        if self.fen == board.fen() and self.lines.get(1):
+            return self.lines[1]['pv'][0]
+        return None
+
+    def stop(self, disable=False):
+        if disable:
+            self.enabled = False
+        with self._lock:
+            self._generation += 1
+        if self._analysis is not None:
+            self._analysis.stop()
+            self._analysis = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+class EngineWorker:
+    """
+    Runs engine requests on a background thread and posts each result to a window as
+    (tag, result, error) under event_key, so searches never block the GUI thread.
+    cancel() drops queued requests and stops the one in flight.
+    """
+    def __init__(self, window, event_key='-ENGINE-RESULT-'):
+        self.window = window
+        self.event_key = event_key
+        self.busy_tags = set()
+        self._queue = queue.Queue()
+        self._token = CancelToken()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='engine-worker')
+        self._thread.start()
+
+    def submit(self, tag, function):
+        # function is called as function(cancel=token) on the worker thread
+        with self._lock:
+            token = self._token
+            self.busy_tags.add(tag)
+        self._queue.put((token, tag, function))
+
+    def is_busy(self, tag=None):
+        return bool(self.busy_tags) if tag is None else tag in self.busy_tags
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            token, tag, function = item
+            if token.is_cancelled():
+                continue
+            try:
+                result, error = function(cancel=token), None
+            except SearchCancelled:
+                continue
+            except Exception as e:
+                result, error = None, e
+            if not token.is_cancelled():
+                self.window.write_event_value(self.event_key, (tag, result, error))
+
+    def finish(self, tag):
+        # Called by the GUI thread once it has handled the result for tag
+        self.busy_tags.discard(tag)
+
+    def cancel(self):
+        with self._lock:
+            token, self._token = self._token, CancelToken()
+            self.busy_tags.clear()
+        token.cancel()
+
+    def close(self):
+        self.cancel()
+        self._queue.put(None)
+
+class EventTimer:
+    """
+    Posts event_key to a window once after a delay, so event loops can block on read() instead of
+    waking up on a timeout to check the clock. Starting it again replaces a pending tick.
+    """
+    def __init__(self, window, event_key):
+        self.window = window
+        self.event_key = event_key
+        self._timer = None
+
+    def start(self, delay):
+        self.cancel()
+        self._timer = threading.Timer(max(0.0, delay), self.window.write_event_value, args=(self.event_key, None))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def is_pending(self):
+        return self._timer is not None and self._timer.is_alive()
+
+    def cancel(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
 
-def get_image_file(piece):
-    if piece:
-        piece_color = 'w' if piece.color == chess.WHITE else 'b'
-        piece_name = piece.symbol().upper() if piece.color == chess.WHITE else piece.symbol().lower()
-        return os.path.join(IMAGE_FOLDER_PATH, f"{piece_color}{piece_name}.png")
-    return os.path.join(IMAGE_FOLDER_PATH, "empty.png")
 
-def create_board_window(board, player_side='white', engine1_name=None, engine2_name=None):
+class SpriteCache:
+    """
+    Piece images read from IMAGE_FOLDER_PATH once and decoded once per square size, so board
+    updates never touch the disk.
+    """
+    SPRITE_NAMES = [f"{color}{piece}" for color in 'wb' for piece in 'PNBRQK'] + ['empty']
+
+    def __init__(self, folder=IMAGE_FOLDER_PATH):
+        self.folder = folder
+        self._data = {}  # sprite name -> base64 encoded PNG
+        self._images = {}  # (sprite name, square size) -> tk.PhotoImage
+        self._interpreter = None
+
+    def load(self):
+        for name in self.SPRITE_NAMES:
+            with open(os.path.join(self.folder, f"{name}.png"), 'rb') as image_file:
+                self._data[name] = base64.b64encode(image_file.read())
+
+    @staticmethod
+    def sprite_name(piece):
+        if piece:
+            return f"{'w' if piece.color == chess.WHITE else 'b'}{piece.symbol().upper()}"
+        return 'empty'
+
+    def image(self, master, piece, size=None):
+        if not self._data:
+            self.load()
+        # Images belong to a Tk interpreter, start over if the GUI was torn down and recreated
+        if master.tk is not self._interpreter:
+            self._images.clear()
+            self._interpreter = master.tk
+        name = self.sprite_name(piece)
+        key = (name, size)
+        if key not in self._images:
+            image = tk.PhotoImage(master=master, data=self._data[name])
+            if size and size != image.width():
+                # Tk only scales by integer factors, so scale by zoom/subsample of a close fraction
+                ratio = fractions.Fraction(size, image.width()).limit_denominator(10)
+                image = image.zoom(ratio.numerator).subsample(ratio.denominator)
+            self._images[key] = image
+        return self._images[key]
+
+SPRITES = SpriteCache()
+
+def square_button_color(square, highlighted=False):
+    if highlighted:
+        return ('white', 'springgreen4')
+    return ('white', '#D18B47') if (chess.square_rank(square) + chess.square_file(square)) % 2 == 0 else ('black', '#FFCE9E')
+
+def board_square_states(board, highlighted_squares=()):
+    # What each square should show: (piece or None, highlighted)
+    piece_map = board.piece_map()
+    return {square: (piece_map.get(square), square in highlighted_squares) for square in chess.SQUARES}
+
+def diff_square_states(previous, current):
+    if previous is None:
+        return list(current)
+    return [square for square, state in current.items() if previous.get(square) != state]
+
+def set_square_image(window, square, piece, square_size=None):
+    button = window[(chess.square_rank(square), chess.square_file(square))]
+    image = SPRITES.image(window.TKroot, piece, square_size)
+    button.Widget.configure(image=image)
+    button.Widget.image = image
+
+def create_board_window(board, player_side='white', engine1_name=None, engine2_name=None, square_size=None):
     try:
         board_layout = []
         ranks = range(7, -1, -1) if player_side == 'white' else range(8)
@@ -86,13 +1929,21 @@ def create_board_window(board, player_side='white', engine1_name=None, engine2_n
             for file in files:
                 square = chess.square(file, rank)
                 piece = board.piece_at(square)
-                image_file = get_image_file(piece)
-                button_color = ('white', '#D18B47') if (rank + file) % 2 == 0 else ('black', '#FFCE9E')
-                row.append(sg.Button('', image_filename=image_file, size=(64, 64), key=(rank, file), pad=(0, 0), button_color=button_color))
+                button_color = square_button_color(square)
+                # No image yet: every square is drawn once from the sprite cache below
+                row.append(sg.Button('', size=(64, 64), key=(rank, file), pad=(0, 0), button_color=button_color))
             board_layout.append(row)
 
         header_text = f"{engine1_name} (White) vs {engine2_name} (Black)" if engine1_name and engine2_name else "Chess Board"
-        return sg.Window(header_text, board_layout, finalize=True)
+        # Kept invisible until the pieces are drawn, the imageless buttons are sized in characters
+        window = sg.Window(header_text, board_layout, finalize=True, alpha_channel=0)
+        # The window remembers what is drawn on every square so updates only touch squares that changed
+        states = board_square_states(board)
+        window.metadata = {'squares': states, 'square_size': square_size}
+        for square, (piece, _) in states.items():
+            set_square_image(window, square, piece, square_size)
+        window.set_alpha(1)
+        return window
     except Exception as e:
         sg.popup_error(f"Error creating board window: {e}")
 
@@ -100,20 +1951,214 @@ def update_board_window(window, board, player_side='white', highlighted_squares=
     try:
         if highlighted_squares is None:
             highlighted_squares = set()
-        ranks = range(7, -1, -1) if player_side == 'white' else range(8)
-        files = range(8) if player_side == 'white' else range(7, -1, -1)
-        for rank in ranks:
-            for file in files:
-                square = chess.square(file, rank)
-                piece = board.piece_at(square)
-                image_file = get_image_file(piece)
-                button_color = ('white', '#D18B47') if (rank + file) % 2 == 0 else ('black', '#FFCE9E')
-                if square in highlighted_squares:
-                    button_color = ('white', 'springgreen4')
-                window[(rank, file)].update(image_filename=image_file, button_color=button_color)
+        metadata = window.metadata if isinstance(window.metadata, dict) else {}
+        previous = metadata.get('squares')
+        square_size = metadata.get('square_size')
+        states = board_square_states(board, highlighted_squares)
+        for square in diff_square_states(previous, states):
+            piece, highlighted = states[square]
+            old_piece, old_highlighted = previous[square] if previous else (None, None)
+            if previous is None or old_piece != piece:
+                set_square_image(window, square, piece, square_size)
+            if previous is None or old_highlighted != highlighted:
+                window[(chess.square_rank(square), chess.square_file(square))].update(button_color=square_button_color(square, highlighted))
+        window.metadata = {'squares': states, 'square_size': square_size}
     except Exception as e:
         sg.popup_error(f"Error updating board window: {e}")
 
+class MoveList:
+    """
+    Keeps a move listbox in sync with a line of game nodes. Only the part of the line that changed
+    is redrawn, the label of every node is computed once and listbox indices map straight to nodes.
+    """
+    def __init__(self, listbox, notation='san'):
+        self.listbox = listbox
+        self.notation = notation
+        self.root = None
+        self.nodes = []
+        self.labels = []
+        self._index = {}  # node -> listbox index
+        self._board = None  # position after the last listed move, used to compute SAN
+        self._unplayable = None  # index of the first listed move that could not be replayed
+
+    def _truncate(self, length):
+        if length >= len(self.nodes):
+            return
+        for node in self.nodes[length:]:
+            del self._index[node]
+            if self._board is not None:
+                self._board.pop()
+        del self.nodes[length:]
+        del self.labels[length:]
+        self.listbox.Widget.delete(length, 'end')
+        if self._unplayable is not None and length <= self._unplayable:
+            # The move that broke the replay is gone, the remaining ones can be replayed again
+            self._unplayable = None
+            self._board = self._replay(length)
+
+    def _replay(self, length):
+        if self.notation != 'san' or self.root is None:
+            return None
+        board = self.root.board()
+        try:
+            for node in self.nodes[:length]:
+                board.push(node.move)
+        except Exception:
+            return None
+        return board
+
+    def _label(self, move):
+        if self.notation == 'uci' or self._board is None:
+            return move.uci()
+        try:
+            return self._board.san(move)
+        except Exception:
+            return move.uci()
+
+    def sync(self, tail):
+        """
+        Makes the list show the line from the root of tail's game down to tail.
+        """
+        new_nodes = []
+        node = tail
+        while node.parent is not None and node not in self._index:
+            new_nodes.append(node)
+            node = node.parent
+
+        if node.parent is None:
+            # Reached the root without meeting a listed node: a new game or a different first move
+            self._truncate(0)
+            if node is not self.root:
+                self.root = node
+                self._unplayable = None
+                self._board = node.board() if self.notation == 'san' else None
+        else:
+            self._truncate(self._index[node] + 1)
+
+        added = []
+        for node in reversed(new_nodes):
+            label = self._label(node.move)
+            if self._board is not None:
+                try:
+                    self._board.push(node.move)
+                except Exception:
+                    # Edited positions (summoned pieces, setup mode) cannot be replayed, fall back to UCI
+                    self._board = None
+                    self._unplayable = len(self.nodes)
+            self._index[node] = len(self.nodes)
+            self.nodes.append(node)
+            self.labels.append(label)
+            added.append(label)
+        if added:
+            self.listbox.Widget.insert('end', *added)
+        # Keep PySimpleGUI's copy of the values in step with the widget
+        self.listbox.Values = self.labels
+
+    def select(self, node):
+        index = self._index.get(node)
+        if index is None:
+            self.listbox.Widget.selection_clear(0, 'end')
+        else:
+            self.listbox.update(set_to_index=index, scroll_to_index=max(0, index - 5))
+
+    def node_at(self, index):
+        return self.nodes[index] if 0 <= index < len(self.nodes) else None
+
+def line_end(node):
+    while node.variations:
+        node = node.variations[0]
+    return node
+
+def goto_node(board, from_node, to_node):
+    """
+    Moves board from the position of from_node to the position of to_node by popping up to their
+    common ancestor and pushing down from there, so a jump costs the distance travelled rather than
+    a replay from the root. Returns the board to use, which is a fresh to_node.board() if the board
+    does not follow the game tree (e.g. after summoning pieces).
+    """
+    if from_node is to_node:
+        return board
+
+    # Walk up from both nodes in lockstep until one path meets the other
+    ups, downs = [from_node], [to_node]
+    up_seen, down_seen = {from_node}, {to_node}
+    while True:
+        if ups[-1] in down_seen:
+            ancestor = ups[-1]
+            break
+        if downs[-1] in up_seen:
+            ancestor = downs[-1]
+            break
+        up_parent, down_parent = ups[-1].parent, downs[-1].parent
+        if up_parent is None and down_parent is None:
+            return to_node.board()
+        if up_parent is not None:
+            ups.append(up_parent)
+            up_seen.add(up_parent)
+        if down_parent is not None:
+            downs.append(down_parent)
+            down_seen.add(down_parent)
+
+    for node in ups[:ups.index(ancestor)]:
+        if not board.move_stack or board.peek() != node.move:
+            return to_node.board()
+        board.pop()
+    for node in reversed(downs[:downs.index(ancestor)]):
+        board.push(node.move)
+    return board
+
+class PositionInfo:
+    """
+    Data derived from one position: legal moves by from-square and by (from, to) squares, check,
+    king and termination status.
+    """
+    def __init__(self, board):
+        self.key = self.key_of(board)
+        self.targets = {}  # from square -> frozenset of to squares
+        self.moves = {}  # (from square, to square) -> legal moves, several for promotions
+        for move in board.legal_moves:
+            self.targets.setdefault(move.from_square, set()).add(move.to_square)
+            self.moves.setdefault((move.from_square, move.to_square), []).append(move)
+        self.targets = {square: frozenset(targets) for square, targets in self.targets.items()}
+        self.is_check = board.is_check()
+        self.has_both_kings = has_both_kings(board)
+        self.outcome = board.outcome()
+
+    @staticmethod
+    def key_of(board):
+        return chess.polyglot.zobrist_hash(board), len(board.move_stack), board.halfmove_clock
+
+    @property
+    def is_game_over(self):
+        return self.outcome is not None
+
+    @property
+    def is_checkmate(self):
+        return self.outcome is not None and self.outcome.termination == chess.Termination.CHECKMATE
+
+    @property
+    def is_stalemate(self):
+        return self.outcome is not None and self.outcome.termination == chess.Termination.STALEMATE
+
+class PositionCache:
+    """
+    PositionInfo for each ply along a board's move stack. Entries are built the first time a
+    position is asked for after a push, entries past the current ply are dropped after a pop, and an
+    entry is rebuilt when the position at its ply has changed (setup edits, a different move).
+    """
+    def __init__(self):
+        self._entries = []
+
+    def get(self, board):
+        ply = len(board.move_stack)
+        del self._entries[ply + 1:]
+        key = PositionInfo.key_of(board)
+        if len(self._entries) == ply + 1 and self._entries[ply] is not None and self._entries[ply].key == key:
+            return self._entries[ply]
+        info = PositionInfo(board)
+        self._entries[ply:] = [None] * (ply - len(self._entries)) + [info]
+        return info
+
 def is_pawn_promotion(move, board):
     piece = board.piece_at(move.from_square)
     if piece and piece.piece_type == chess.PAWN:
@@ -165,20 +2210,136 @@ def save_game(game, default_path, allow_save=True):
     except Exception as e:
         sg.popup_error(f"Error during game saving: {e}")
 
+class PgnIndex:
+    """
+    Byte offsets and key headers of every game in a PGN file, kept in a <file>.idx sidecar.
+    The sidecar is rebuilt with a header-only scan whenever the file's size or mtime changes.
+    """
+    HEADERS = ('White', 'Black', 'Result', 'Date', 'ECO')
+    TAG_REGEX = re.compile(rb'^\s*\[([A-Za-z0-9_]+)\s+"(.*)"\s*\]')
+    RESULT_REGEX = re.compile(rb'(?:^|\s)(?:1-0|0-1|1/2-1/2|\*)(?=\s|$)')
+    # Sidecars written by an older scanner are rebuilt
+    VERSION = 2
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + PGN_INDEX_SUFFIX
+        self.games = []  # (offset, {header: value}) per game
+        if not self._load():
+            self._build()
+
+    def _stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r') as index_file:
+                data = json.load(index_file)
+            if data.get('version') != self.VERSION or (data['size'], data['mtime']) != self._stamp():
+                return False
+            self.games = [(offset, dict(zip(self.HEADERS, values))) for offset, *values in data['games']]
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    @staticmethod
+    def _strip_comments(line, in_comment):
+        # Removes {...} and ; comments from a movetext line. Returns the rest and whether a { comment
+        # is still open at the end of the line.
+        text = b''
+        while line:
+            if in_comment:
+                end = line.find(b'}')
+                if end < 0:
+                    return text, True
+                line = line[end + 1:]
+                in_comment = False
+            start = min((i for i in (line.find(b'{'), line.find(b';')) if i >= 0), default=-1)
+            if start < 0:
+                return text + line, False
+            text += line[:start] + b' '
+            if line[start:start + 1] == b';':
+                return text, False
+            line = line[start + 1:]
+            in_comment = True
+        return text, in_comment
+
+    def _build(self):
+        size, mtime = self._stamp()
+        self.games = []
+        headers = None
+        # 'between' games, in a game's 'tags' or in its 'movetext'
+        state = 'between'
+        in_comment = False
+        offset = 0
+        with open(self.path, 'rb') as pgn_file:
+            for line in pgn_file:
+                if offset == 0 and line.startswith(codecs.BOM_UTF8):
+                    # Windows exporters often start the file with a UTF-8 byte order mark
+                    offset = len(codecs.BOM_UTF8)
+                    line = line[offset:]
+                match = None if in_comment else self.TAG_REGEX.match(line)
+                if match:
+                    # A tag pair outside a game's tag section starts the next game
+                    if state != 'tags':
+                        headers = {}
+                        self.games.append((offset, headers))
+                        state = 'tags'
+                    name = match.group(1).decode('ascii')
+                    if name in self.HEADERS:
+                        headers[name] = match.group(2).decode('utf-8', errors='replace')
+                elif state == 'tags' and not line.strip():
+                    # A blank line ends the tag section, even of a game without moves
+                    state = 'movetext'
+                elif in_comment or not line.startswith(b'%'):
+                    text, in_comment = self._strip_comments(line, in_comment)
+                    if text.strip():
+                        if state == 'between':
+                            # Movetext without tag pairs still counts as a game
+                            headers = {}
+                            self.games.append((offset, headers))
+                        # The result token ends the game's movetext
+                        state = 'between' if self.RESULT_REGEX.search(text) else 'movetext'
+                offset += len(line)
+        self.games = [(offset, {name: headers.get(name, '?') for name in self.HEADERS}) for offset, headers in self.games]
+
+        try:
+            with open(self.index_path, 'w') as index_file:
+                json.dump({'version': self.VERSION, 'size': size, 'mtime': mtime,
+                           'games': [[offset] + [headers[name] for name in self.HEADERS]
+                                     for offset, headers in self.games]}, index_file)
+        except OSError:
+            pass  # Read-only folder, keep the index in memory only
+
+    def __len__(self):
+        return len(self.games)
+
+    def label(self, number):
+        headers = self.games[number][1]
+        return f"{number + 1}. {headers['White']} - {headers['Black']}  {headers['Result']}  {headers['Date']}  {headers['ECO']}"
+
+    def read_game(self, number):
+        """
+        Seeks straight to the given game (0-based) and parses only that game.
+        """
+        start = self.games[number][0]
+        end = self.games[number + 1][0] if number + 1 < len(self.games) else None
+        with open(self.path, 'rb') as pgn_file:
+            pgn_file.seek(start)
+            data = pgn_file.read(end - start if end is not None else -1)
+        return chess.pgn.read_game(io.StringIO(data.decode('utf-8', errors='replace')))
+
 def select_engine(engines):
     try:
-        difficulty_levels = [
-            "Super Duper Easy",
-            "Easy",
-            "Medium",
-            "Hard",
-            "Impossible"
-        ]
+        difficulty_levels = DIFFICULTY_LEVELS
 
         layout = [
             [sg.Text('Select an engine for the game')],
-            [sg.Listbox(list(engines.keys()), size=(20, len(engines)), key='Engine', select_mode=sg.LISTBOX_SELECT_MODE_SINGLE)],
+            [sg.Listbox(list(engines.keys()), size=(20, len(engines)), key='Engine', select_mode=sg.LISTBOX_SELECT_MODE_SINGLE, enable_events=True)],
             [sg.Text("Select Difficulty:"), sg.Combo(difficulty_levels, key='Difficulty', default_value='Medium')],
+            [sg.Text("Time Control:"), sg.Combo(TIME_CONTROLS, key='TimeControl', default_value='None', readonly=True),
+             sg.Combo(INCREMENT_MODES, key='IncrementMode', default_value='Fischer', readonly=True)],
             [sg.Button('Confirm', key='Confirm')]
         ]
         selection_window = sg.Window('Engine Selection', layout)
@@ -186,34 +2347,34 @@ def select_engine(engines):
             event, values = selection_window.read()
             if event in (sg.WIN_CLOSED, 'Confirm'):
                 break
+            if event == 'Engine' and values['Engine'] and needs_engine(values['Difficulty']):
+                # Start a lazily loaded engine while the user finishes the selection
+                engines[values['Engine'][0]].start()
         selection_window.close()
         if event == sg.WIN_CLOSED or not values['Engine']:
-            return None, None
+            return None, None, None
         selected_engine = values['Engine'][0]
         selected_difficulty = values['Difficulty']
-        return selected_engine, selected_difficulty
+        time_control = TimeControl.parse(values['TimeControl'], values['IncrementMode'])
+        return selected_engine, selected_difficulty, time_control
     except Exception as e:
         sg.popup_error(f"Error during engine selection: {e}")
-        return None, None
+        return None, None, None
 
 def select_two_engines(engines):
     try:
-        difficulty_levels = [
-            "Super Duper Easy",
-            "Easy",
-            "Medium",
-            "Hard",
-            "Impossible"
-        ]
+        difficulty_levels = DIFFICULTY_LEVELS
 
         layout = [
             [sg.Text('Select two engines for a game')],
             [sg.Text('Engine 1:')],
-            [sg.Listbox(list(engines.keys()), size=(20, len(engines)), key='Engine1', select_mode=sg.LISTBOX_SELECT_MODE_SINGLE)],
+            [sg.Listbox(list(engines.keys()), size=(20, len(engines)), key='Engine1', select_mode=sg.LISTBOX_SELECT_MODE_SINGLE, enable_events=True)],
             [sg.Text("Select Difficulty for Engine 1:"), sg.Combo(difficulty_levels, key='Difficulty1', default_value='Medium')],
             [sg.Text('Engine 2:')],
-            [sg.Listbox(list(engines.keys()), size=(20, len(engines)), key='Engine2', select_mode=sg.LISTBOX_SELECT_MODE_SINGLE)],
+            [sg.Listbox(list(engines.keys()), size=(20, len(engines)), key='Engine2', select_mode=sg.LISTBOX_SELECT_MODE_SINGLE, enable_events=True)],
             [sg.Text("Select Difficulty for Engine 2:"), sg.Combo(difficulty_levels, key='Difficulty2', default_value='Medium')],
+            [sg.Text("Time Control:"), sg.Combo(TIME_CONTROLS, key='TimeControl', default_value='None', readonly=True),
+             sg.Combo(INCREMENT_MODES, key='IncrementMode', default_value='Fischer', readonly=True)],
             [sg.Button('Start Game', key='StartGame')]
         ]
         selection_window = sg.Window('Engine Selection', layout)
@@ -221,17 +2382,20 @@ def select_two_engines(engines):
             event, values = selection_window.read()
             if event in (sg.WIN_CLOSED, 'StartGame'):
                 break
+            if event in ('Engine1', 'Engine2') and values[event] and needs_engine(values['Difficulty' + event[-1]]):
+                engines[values[event][0]].start()
         selection_window.close()
         if event == sg.WIN_CLOSED or not values['Engine1'] or not values['Engine2']:
-            return None, None, None, None
+            return None, None, None, None, None
         engine1_name = values['Engine1'][0]
         engine2_name = values['Engine2'][0]
         difficulty1 = values['Difficulty1']
         difficulty2 = values['Difficulty2']
-        return engine1_name, engine2_name, difficulty1, difficulty2
+        time_control = TimeControl.parse(values['TimeControl'], values['IncrementMode'])
+        return engine1_name, engine2_name, difficulty1, difficulty2, time_control
     except Exception as e:
         sg.popup_error(f"Error during engine selection for two engines: {e}")
-        return None, None, None, None
+        return None, None, None, None, None
 
 def select_side():
     try:
@@ -265,6 +2429,36 @@ def select_analysis_mode():
         sg.popup_error(f"Error during analysis mode selection: {e}")
         return None
 
+def select_pgn_game(index):
+    """
+    Lets the user pick a game from a PgnIndex. Returns the 0-based game number or None.
+    """
+    if len(index) == 1:
+        return 0
+    labels = [index.label(number) for number in range(len(index))]
+    layout = [
+        [sg.Text(f"{os.path.basename(index.path)}: {len(index)} games")],
+        [sg.Input(key='Filter', enable_events=True, size=(60, 1))],
+        [sg.Listbox(labels, size=(60, 20), key='Game', select_mode=sg.LISTBOX_SELECT_MODE_SINGLE, bind_return_key=True)],
+        [sg.Button('Open', key='Open'), sg.Button('Cancel', key='Cancel')]
+    ]
+    selection_window = sg.Window('Select Game', layout)
+    shown = labels
+    number = None
+    while True:
+        event, values = selection_window.read()
+        if event in (sg.WIN_CLOSED, 'Cancel'):
+            break
+        if event == 'Filter':
+            text = values['Filter'].lower()
+            shown = [label for label in labels if text in label.lower()]
+            selection_window['Game'].update(shown)
+        elif event in ('Open', 'Game') and values['Game']:
+            number = labels.index(values['Game'][0])
+            break
+    selection_window.close()
+    return number
+
 def generate_random_position():
     import random
     board = chess.Board()
@@ -299,7 +2493,7 @@ def enforce_single_king_per_side(board):
 def has_both_kings(board):
     return board.king(chess.WHITE) is not None and board.king(chess.BLACK) is not None
 
-def play_game(human_side, engine, engines, main_window, save_path, game_number, difficulty, is_analysis_mode=False):
+def play_game(human_side, engine, engines, main_window, save_path, game_number, difficulty, is_analysis_mode=False, time_control=None):
     import time
     board = chess.Board()
     game = chess.pgn.Game()
@@ -307,8 +2501,13 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
     move_history = []
     current_move_index = 0
     player_color = chess.WHITE if human_side == 'white' else chess.BLACK
+    # The side to move's clock runs, the engine is told both sides' remaining time
+    clock = ChessClock(time_control) if time_control is not None else None
 
-    custom_engine = CustomEngine(engine, difficulty)
+    # The engine ponders during the human's turn on levels that always search
+    custom_engine = CustomEngine(engine, difficulty, ponder=True)
+    # Legal moves and game status of the positions along the board's move stack
+    positions = PositionCache()
 
     board_window = create_board_window(board, player_side=human_side)
     control_layout = [
@@ -321,13 +2520,21 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
         [sg.Button("Summon Piece", key="-SUMMON-", size=(12, 1)),
          sg.Button("Reset Board", key="-RESET-", size=(12, 1))],
         [sg.Text("FEN:"), sg.InputText(key="-FEN-", size=(50, 1)), sg.Button("Copy FEN", key="-COPY-FEN-", size=(12, 1))],
-        [sg.Listbox(values=[], size=(60, 10), key='-MOVE-LIST-')]  # Move List to display moves
+        [sg.Listbox(values=[], size=(60, 10), key='-MOVE-LIST-')],  # Move List to display moves
+        [sg.Text(custom_engine.ponder_report() if custom_engine.ponder else "", key="-PONDER-", size=(40, 1))],
+        [sg.Text(clock.display() if clock is not None else "", key="-CLOCK-", size=(40, 1))]
     ]
     control_window = sg.Window("Game Controls", control_layout, finalize=True)
+    move_list = MoveList(control_window['-MOVE-LIST-'], notation='uci')
+    # Engine searches run here and come back as -ENGINE-RESULT- events on the control window
+    engine_worker = EngineWorker(control_window)
+    autoplay_timer = EventTimer(control_window, "-AUTOPLAY-TICK-")
+    clock_timer = EventTimer(control_window, "-CLOCK-TICK-")
 
     selected_square = None
     autoplay = False
     autoplay_speed = 5
+    last_autoplay_time = 0.0
     setup_mode = False
 
     game_over = False
@@ -337,12 +2544,7 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
             highlight_squares = set()
         update_board_window(board_window, board, player_side=human_side, highlighted_squares=highlight_squares)
         control_window["-FEN-"].update(board.fen())
-        move_list = []
-        node = game
-        while node.variations:
-            node = node.variations[0]
-            move_list.append(node.move.uci())
-        control_window['-MOVE-LIST-'].update(move_list)
+        move_list.sync(line_end(game))
 
     def make_move(move, is_engine_move=False):
         nonlocal current_node, current_move_index, game_over
@@ -367,20 +2569,27 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
                 current_node.variations = []
                 current_node.comment = ""
 
+            # Whatever the engine was working on belongs to the previous position
+            engine_worker.cancel()
             board.push(move)
             move_history.append(move)
             current_move_index += 1
             new_node = current_node.add_variation(move)
             current_node = new_node
+            if clock is not None:
+                # Charges the mover and adds the increment
+                clock.run(board.turn)
+                new_node.set_clock(max(clock.time_left(not board.turn), 0.0))
             update_board(highlight_squares={move.from_square, move.to_square})
 
             # Check for game over
-            if board.is_checkmate():
+            info = positions.get(board)
+            if info.is_checkmate:
                 result = "1-0" if board.turn == chess.BLACK else "0-1"
                 sg.popup(f"Checkmate! {'White' if result == '1-0' else 'Black'} wins.")
                 game.headers["Result"] = result
                 game_over = True
-            elif board.is_stalemate():
+            elif info.is_stalemate:
                 sg.popup("Stalemate! The game is a draw.")
                 game.headers["Result"] = "1/2-1/2"
                 game_over = True
@@ -390,16 +2599,19 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
             sg.popup_error(f"Error making move: {e}")
             return False
 
-    def undo_move():
+    def undo_move(redraw=True):
         nonlocal current_node, current_move_index
         if current_move_index > 0 and current_node.parent is not None:
             board.pop()
             current_node = current_node.parent
             current_move_index -= 1
             move_history.pop()
-            update_board()
+            if redraw:
+                update_board()
+            return True
+        return False
 
-    def redo_move():
+    def redo_move(redraw=True):
         nonlocal current_node, current_move_index
         if current_node.variations and current_move_index < len(move_history) + 1:
             move = current_node.variations[0].move
@@ -409,21 +2621,65 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
             current_node = current_node.variations[0]
             current_move_index += 1
             move_history.append(move)
-            update_board()
+            if redraw:
+                update_board()
 
     def provide_hint():
-        try:
-            if not has_both_kings(board):
-                sg.popup("Cannot provide a hint on an invalid board position.")
-                return
-            result = custom_engine.analyse(board, chess.engine.Limit(time=0.1))
-            if 'pv' in result and len(result['pv']) > 0:
-                best_move = result['pv'][0]
-                update_board(highlight_squares={best_move.from_square, best_move.to_square})
-            else:
-                sg.popup_error("Engine did not return a valid principal variation (PV).")
-        except Exception as e:
-            sg.popup_error(f"Error providing hint: {e}")
+        if not has_both_kings(board):
+            sg.popup("Cannot provide a hint on an invalid board position.")
+            return
+        # Searches work on a copy so the board can change while the engine thinks
+        position = board.copy()
+        engine_worker.submit('hint', lambda cancel: (position.fen(), custom_engine.analyse(position, chess.engine.Limit(time=0.1), cancel=cancel)))
+
+    def show_hint(result):
+        if 'pv' in result and len(result['pv']) > 0:
+            best_move = result['pv'][0]
+            update_board(highlight_squares={best_move.from_square, best_move.to_square})
+        else:
+            sg.popup_error("Engine did not return a valid principal variation (PV).")
+
+    def request_engine_move():
+        if engine_worker.is_busy('move'):
+            return
+        position = board.copy()
+        def search(cancel):
+            move = custom_engine.play(position, cancel=cancel, clock=clock)
+            return position.fen(), (move, custom_engine.last_move_time, custom_engine.last_info)
+        engine_worker.submit('move', search)
+
+    def engine_to_move():
+        info = positions.get(board)
+        return not info.is_game_over and board.turn != player_color and info.has_both_kings
+
+    def schedule_autoplay():
+        # The engine plays both sides, one move per autoplay interval. A timer event wakes the
+        # loop when the next move is due.
+        info = positions.get(board)
+        if (not autoplay or game_over or engine_worker.is_busy('move')
+                or info.is_game_over or not info.has_both_kings):
+            autoplay_timer.cancel()
+            return
+        remaining = last_autoplay_time + 1.0 / autoplay_speed - time.time()
+        if remaining <= 0:
+            request_engine_move()
+        else:
+            autoplay_timer.start(remaining)
+
+    def update_clock():
+        # Refreshes the clock display while it runs and ends the game when a flag falls
+        nonlocal game_over
+        if clock is None or game_over:
+            return
+        control_window["-CLOCK-"].update(clock.display())
+        flagged = clock.flagged()
+        if flagged is None:
+            clock_timer.start(CLOCK_REFRESH_INTERVAL)
+            return
+        engine_worker.cancel()
+        sg.popup(f"{'White' if flagged == chess.WHITE else 'Black'} lost on time.")
+        game.headers["Result"] = time_forfeit_result(board, flagged)
+        game_over = True
 
     def summon_piece():
         nonlocal current_node, move_history, current_move_index
@@ -458,7 +2714,7 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
             return
 
         while True:
-            board_event, _ = board_window.read(timeout=100)
+            board_event, _ = board_window.read()
 
             if board_event == sg.WIN_CLOSED:
                 break
@@ -499,12 +2755,12 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
 
     update_board()
 
+    if clock is not None:
+        clock.run(board.turn, increment=False)
+        update_clock()
+
     if board.turn != player_color and has_both_kings(board):
-        try:
-            result_move = custom_engine.play(board)
-            make_move(result_move, is_engine_move=True)
-        except Exception as e:
-            sg.popup_error(f"Engine error: {e}")
+        request_engine_move()
 
     while True:
         if game_over:
@@ -513,7 +2769,8 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
             sg.popup(f'Game over. Result: {result}. Winner: {winner}\nDifficulty: {difficulty}')
             break
 
-        window, event, values = sg.read_all_windows(timeout=100)
+        # Blocks until there is input, an engine result or an autoplay tick
+        window, event, values = sg.read_all_windows()
 
         if window == control_window and (event == sg.WIN_CLOSED or event == "-RESIGN-"):
             game.headers["Result"] = board.result(claim_draw=True)
@@ -522,6 +2779,32 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
         if window == board_window and event == sg.WIN_CLOSED:
             break
 
+        if window == control_window and event == "-CLOCK-TICK-":
+            update_clock()
+            continue
+
+        if window == control_window and event == engine_worker.event_key:
+            tag, result, error = values[event]
+            engine_worker.finish(tag)
+            if error is not None:
+                sg.popup_error(f"Error providing hint: {error}" if tag == 'hint' else f"Engine error: {error}")
+                continue
+            fen, answer = result
+            if fen != board.fen():
+                # The position changed while the engine was thinking
+                continue
+            if tag == 'hint':
+                show_hint(answer)
+            else:
+                move, seconds, info = answer
+                if make_move(move, is_engine_move=True):
+                    set_search_comments(current_node, seconds, info)
+                last_autoplay_time = time.time()
+                if custom_engine.ponder:
+                    control_window["-PONDER-"].update(custom_engine.ponder_report())
+                schedule_autoplay()
+            continue
+
         if window == board_window:
             if isinstance(event, tuple):
                 rank, file = event
@@ -532,8 +2815,7 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
                     if piece and (piece.color == board.turn == player_color or setup_mode):
                         selected_square = square
                         try:
-                            legal_moves = [move for move in board.legal_moves if move.from_square == selected_square]
-                            update_board(highlight_squares={move.to_square for move in legal_moves})
+                            update_board(highlight_squares=positions.get(board).targets.get(selected_square, set()))
                         except Exception as e:
                             sg.popup_error(f"Error fetching legal moves: {e}")
                             selected_square = None
@@ -549,6 +2831,7 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
                             selected_square = None
                             update_board()
                             continue
+                        engine_worker.cancel()
                         board.remove_piece_at(selected_square)
                         board.set_piece_at(square, piece)
                         enforce_single_king_per_side(board)
@@ -559,7 +2842,7 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
                         update_board()
                     else:
                         try:
-                            legal_moves = [move for move in board.legal_moves if move.from_square == selected_square and move.to_square == square]
+                            legal_moves = positions.get(board).moves.get((selected_square, square), [])
                         except Exception as e:
                             sg.popup_error(f"Error generating legal moves: {e}")
                             selected_square = None
@@ -574,12 +2857,8 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
                                 move = legal_moves[0]
                                 if make_move(move):
                                     selected_square = None
-                                    if not board.is_game_over() and board.turn != player_color and has_both_kings(board):
-                                        try:
-                                            result_move = custom_engine.play(board)
-                                            make_move(result_move, is_engine_move=True)
-                                        except Exception as e:
-                                            sg.popup_error(f"Engine error: {e}")
+                                    if engine_to_move():
+                                        request_engine_move()
                                 else:
                                     selected_square = None
                                     update_board()
@@ -594,12 +2873,8 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
                                         if move in legal_moves:
                                             if make_move(move):
                                                 selected_square = None
-                                                if not board.is_game_over() and board.turn != player_color and has_both_kings(board):
-                                                    try:
-                                                        result_move = custom_engine.play(board)
-                                                        make_move(result_move, is_engine_move=True)
-                                                    except Exception as e:
-                                                        sg.popup_error(f"Engine error: {e}")
+                                                if engine_to_move():
+                                                    request_engine_move()
                                             else:
                                                 selected_square = None
                                                 update_board()
@@ -612,6 +2887,10 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
                                     update_board()
 
         elif window == control_window:
+            if event in ("-UNDO-", "-REDO-", "-START-", "-END-", "-BACKWARD-", "-FORWARD-", "-SUMMON-", "-RESET-", "-FEN-"):
+                # The position is about to change, stop searches for the current one
+                engine_worker.cancel()
+
             if event == "-HINT-":
                 provide_hint()
             elif event == "-UNDO-":
@@ -619,11 +2898,14 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
             elif event == "-REDO-":
                 redo_move()
             elif event == "-START-":
-                while current_move_index > 0:
-                    undo_move()
+                # Step through the moves without redrawing in between
+                while current_move_index > 0 and undo_move(redraw=False):
+                    pass
+                update_board()
             elif event == "-END-":
                 while current_node.variations:
-                    redo_move()
+                    redo_move(redraw=False)
+                update_board()
             elif event == "-BACKWARD-":
                 undo_move()
             elif event == "-FORWARD-":
@@ -663,29 +2945,30 @@ def play_game(human_side, engine, engines, main_window, save_path, game_number,
                 except ValueError as e:
                     sg.popup_error(f"Invalid FEN string: {e}")
 
-        if autoplay and not board.is_game_over() and not game_over and has_both_kings(board):
-            if board.turn == player_color:
-                try:
-                    result_move = custom_engine.play(board)
-                    make_move(result_move)
-                except Exception as e:
-                    sg.popup_error(f"Engine error: {e}")
-            else:
-                try:
-                    result_move = custom_engine.play(board)
-                    make_move(result_move, is_engine_move=True)
-                except Exception as e:
-                    sg.popup_error(f"Engine error: {e}")
-            time.sleep(1.0 / autoplay_speed)
+            if clock is not None and clock.running != board.turn:
+                # Undo, navigation and new positions hand the clock to the side to move, without an increment
+                clock.run(board.turn, increment=False)
+
+        schedule_autoplay()
 
+    autoplay_timer.cancel()
+    clock_timer.cancel()
+    if time_control is not None:
+        game.headers["TimeControl"] = time_control.pgn_header()
+    engine_worker.close()
+    try:
+        # Do not leave the engine searching after it goes back to the pool
+        custom_engine.stop_pondering()
+    except Exception:
+        pass
     board_window.close()
     control_window.close()
     save_game(game, save_path, allow_save=not is_analysis_mode)
     return board.fen()
 
-def engine_vs_engine_game(engine1, engine2, main_window, save_path, game_number, engine1_name, engine2_name):
+def engine_vs_engine_game(engine1, engine2, main_window, save_path, game_number, engine1_name, engine2_name, time_control=None):
     """
-    Handles playing a game between two engines.
+    Handles playing a game between two engines, on a clock if a TimeControl is given.
     """
     import threading
     import time
@@ -695,7 +2978,9 @@ def engine_vs_engine_game(engine1, engine2, main_window, save_path, game_number,
         enforce_single_king_per_side(board)
         game = chess.pgn.Game()
         current_node = game
-        move_history = []
+        clock = ChessClock(time_control) if time_control is not None else None
+        if clock is not None:
+            game.headers["TimeControl"] = time_control.pgn_header()
 
         # Create the board window
         board_window = create_board_window(board, player_side='white', engine1_name=engine1_name, engine2_name=engine2_name)
@@ -704,126 +2989,181 @@ def engine_vs_engine_game(engine1, engine2, main_window, save_path, game_number,
         control_layout = [
             [sg.Button("Pause", key="-PAUSE-"), sg.Button("Resume", key="-RESUME-", disabled=True), sg.Button("Stop", key="-STOP-")],
             [sg.Button("<<", key="-START-"), sg.Button("<", key="-BACKWARD-"), sg.Button(">", key="-FORWARD-"), sg.Button(">>", key="-END-")],
+            [sg.Checkbox("Fast mode", key="-FAST-", enable_events=True)],
+            [sg.Text(clock.display() if clock is not None else "", key="-CLOCK-", size=(40, 1))],
             [sg.Listbox(values=[], size=(60, 10), key='-MOVE-LIST-')]  # Move List to display moves
         ]
         control_window = sg.Window("Engine vs Engine Controls", control_layout, finalize=True)
-
-        paused = False
-        game_active = True
-        move_event = threading.Event()
-
-        def update_board():
-            update_board_window(board_window, board, player_side='white')
-            # Update move list
-            move_list = []
-            node = game
-            while node.variations:
-                node = node.variations[0]
-                move_list.append(node.move.uci())
-            control_window['-MOVE-LIST-'].update(move_list)
-
-        def engine_move():
-            nonlocal current_node, board, game_active, move_history
+        move_list = MoveList(control_window['-MOVE-LIST-'], notation='uci')
+        redraw_timer = EventTimer(control_window, "-EVE-REDRAW-")
+
+        # The engines play on their own thread and board. Moves come back through a queue plus a
+        # -EVE-MOVES- event, so only the GUI thread touches the windows, the game tree and the boards below.
+        moves = queue.Queue()
+        running = threading.Event()
+        running.set()
+        stopped = threading.Event()
+        fast_mode = threading.Event()
+        cancel = CancelToken()
+
+        # Navigation moves a separate view board, board always holds the latest position
+        view_board = board.copy()
+        view_node = current_node
+        last_redraw = 0.0
+
+        def play_moves():
+            position = board.copy()
+            positions = PositionCache()
             current_engine = engine1  # Start with engine1
-            while game_active and not board.is_game_over():
-                if paused:
-                    move_event.wait()
-                try:
-                    # Check if both kings are present
-                    if not has_both_kings(board):
-                        sg.popup("Invalid board state detected. Restoring kings.")
-                        enforce_single_king_per_side(board)
-                        update_board()
-
-                    # Set a time limit for engine moves
-                    result = current_engine.play(board)
-                    move = result
-
-                    # Check if the move would capture a king
-                    target_piece = board.piece_at(move.to_square)
-                    if target_piece and target_piece.piece_type == chess.KING:
-                        sg.popup("Cannot capture the king. This move results in checkmate.")
-                        # Declare checkmate
-                        result = "1-0" if board.turn == chess.WHITE else "0-1"
-                        game.headers["Result"] = result
-                        game_active = False
-                        break
+            try:
+                while not stopped.is_set() and not positions.get(position).is_game_over:
+                    running.wait()
+                    if stopped.is_set():
+                        return
+                    # The clocks only run while an engine thinks, not while paused or during the move delay
+                    if clock is not None:
+                        clock.run(position.turn, increment=False)
+                    move = current_engine.play(position, cancel=cancel, clock=clock)
+                    seconds, info = current_engine.last_move_time, current_engine.last_info
+                    clock_left = None
+                    if clock is not None:
+                        clock.run(None)
+                        clock_left = clock.time_left(position.turn)
+                    if move is None:
+                        control_window.write_event_value("-EVE-OVER-", (position.result(claim_draw=True), "The engine did not return a move."))
+                        return
 
                     # Handle pawn promotion
-                    if is_pawn_promotion(move, board) and move.promotion is None:
+                    if is_pawn_promotion(move, position) and move.promotion is None:
                         move.promotion = chess.QUEEN  # Default promotion to Queen
+                    position.push(move)
+                    moves.put((move, seconds, info, clock_left))
+                    control_window.write_event_value("-EVE-MOVES-", None)
+                    if clock_left is not None and clock_left <= 0:
+                        loser = not position.turn
+                        control_window.write_event_value("-EVE-OVER-", (time_forfeit_result(position, loser),
+                                                                        f"{'White' if loser == chess.WHITE else 'Black'} lost on time."))
+                        return
 
-                    # Apply the move
-                    board.push(move)
-                    move_history.append(move)
-                    new_node = current_node.add_variation(move)
-                    current_node = new_node
+                    # Switch engines
+                    current_engine = engine2 if current_engine is engine1 else engine1
+                    if not fast_mode.is_set():
+                        stopped.wait(EVE_MOVE_DELAY)
+            except SearchCancelled:
+                return
+            except Exception as e:
+                if not stopped.is_set():
+                    control_window.write_event_value("-EVE-ERROR-", e)
+                return
 
-                    # Update the board and GUI
-                    update_board()
-                    time.sleep(0.1)  # Small delay to update GUI
-
-                    # Check for game over
-                    if board.is_checkmate():
-                        result = "1-0" if board.turn == chess.BLACK else "0-1"
-                        sg.popup(f"Checkmate! {'White' if result == '1-0' else 'Black'} wins.")
-                        game.headers["Result"] = result
-                        game_active = False
-                        break
-                    elif board.is_stalemate():
-                        sg.popup("Stalemate! The game is a draw.")
-                        game.headers["Result"] = "1/2-1/2"
-                        game_active = False
-                        break
+            # Check for game over
+            info = positions.get(position)
+            if info.is_checkmate:
+                result = "1-0" if position.turn == chess.BLACK else "0-1"
+                message = f"Checkmate! {'White' if result == '1-0' else 'Black'} wins."
+            elif info.is_stalemate:
+                result, message = "1/2-1/2", "Stalemate! The game is a draw."
+            else:
+                result, message = position.result(claim_draw=True), "Game over. The game is a draw."
+            control_window.write_event_value("-EVE-OVER-", (result, message))
 
-                    # Switch engines
-                    current_engine = engine2 if current_engine == engine1 else engine1
+        def take_moves():
+            # Moves everything the game thread produced into the game tree, returns whether there was anything
+            nonlocal current_node, view_board, view_node
+            taken = False
+            while True:
+                try:
+                    move, seconds, info, clock_left = moves.get_nowait()
+                except queue.Empty:
+                    return taken
+                # The view follows the game if the user is watching the latest position
+                following = view_node is current_node
+                board.push(move)
+                current_node = current_node.add_variation(move)
+                set_search_comments(current_node, seconds, info)
+                if clock_left is not None:
+                    current_node.set_clock(max(clock_left, 0.0))
+                if following:
+                    view_board.push(move)
+                    view_node = current_node
+                taken = True
 
-                except Exception as e:
-                    sg.popup_error(f"Engine error: {e}")
-                    game_active = False
-                    break
+        def update_board():
+            nonlocal last_redraw
+            redraw_timer.cancel()
+            update_board_window(board_window, view_board, player_side='white')
+            move_list.sync(current_node)
+            if clock is not None:
+                control_window["-CLOCK-"].update(clock.display())
+            last_redraw = time.time()
+
+        def request_redraw():
+            # Fast mode caps the refresh rate, moves arriving in between are drawn together
+            if fast_mode.is_set():
+                delay = last_redraw + 1.0 / EVE_FAST_REFRESH_RATE - time.time()
+                if delay > 0:
+                    if not redraw_timer.is_pending():
+                        redraw_timer.start(delay)
+                    return
+            update_board()
+
+        def navigate(target_node):
+            nonlocal view_board, view_node
+            view_board = goto_node(view_board, view_node, target_node)
+            view_node = target_node
+            update_board()
 
         # Start the engine vs engine game in a separate thread
-        game_thread = threading.Thread(target=engine_move, daemon=True)
+        game_thread = threading.Thread(target=play_moves, daemon=True)
         game_thread.start()
 
         while True:
-            event, _ = control_window.read(timeout=100)
+            event, values = control_window.read()
 
             if event == sg.WIN_CLOSED or event == "-STOP-":
-                game_active = False
                 break
+            elif event == "-EVE-MOVES-":
+                if take_moves():
+                    request_redraw()
+            elif event == "-EVE-REDRAW-":
+                update_board()
+            elif event == "-EVE-OVER-":
+                take_moves()
+                update_board()
+                result, message = values[event]
+                game.headers["Result"] = result
+                sg.popup(message)
+            elif event == "-EVE-ERROR-":
+                sg.popup_error(f"Engine error: {values[event]}")
+            elif event == "-FAST-":
+                if values["-FAST-"]:
+                    fast_mode.set()
+                else:
+                    fast_mode.clear()
             elif event == "-PAUSE-":
-                paused = True
+                running.clear()
                 control_window["-PAUSE-"].update(disabled=True)
                 control_window["-RESUME-"].update(disabled=False)
             elif event == "-RESUME-":
-                paused = False
-                move_event.set()
+                running.set()
                 control_window["-PAUSE-"].update(disabled=False)
                 control_window["-RESUME-"].update(disabled=True)
-                move_event.clear()
-            elif event == "-FORWARD-" and current_node.variations:
-                current_node = current_node.variations[0]
-                board = current_node.board()
-                update_board()
-            elif event == "-BACKWARD-" and current_node.parent:
-                current_node = current_node.parent
-                board = current_node.board()
-                update_board()
+            elif event == "-FORWARD-" and view_node.variations:
+                navigate(view_node.variations[0])
+            elif event == "-BACKWARD-" and view_node.parent:
+                navigate(view_node.parent)
             elif event == "-START-":
-                current_node = game
-                board = current_node.board()
-                update_board()
+                navigate(game)
             elif event == "-END-":
-                while current_node.variations:
-                    current_node = current_node.variations[0]
-                board = current_node.board()
-                update_board()
+                navigate(line_end(view_node))
 
-        # Wait for the game thread to finish
+        # Stop the game thread, a running search is interrupted
+        stopped.set()
+        running.set()
+        cancel.cancel()
+        redraw_timer.cancel()
         game_thread.join()
+        take_moves()
 
         board_window.close()
         control_window.close()
@@ -854,6 +3194,17 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
     import chess.engine
     import PySimpleGUI as sg
 
+    # Engine instances taken from the pools for this analysis session, by engine name
+    analysis_engines = {}
+    engine_worker = None
+    infinite_analysis = None
+    autoplay_timer = None
+
+    def get_analysis_engine(name):
+        if name not in analysis_engines:
+            analysis_engines[name] = engines[name].acquire()
+        return analysis_engines[name]
+
     try:
         # Initialize variables
         game = chess.pgn.Game()
@@ -989,12 +3340,53 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
                 sg.Button("Set FEN", key="-SET-FEN-"),
                 sg.Button("Copy FEN", key="-COPY-FEN-")
             ],
-            [sg.Button("Quit", key="-QUIT-")],
+            [sg.Button("Quit", key="-QUIT-"), sg.Text("", key="-CACHE-STATS-", size=(50, 1))],
+            [
+                sg.Button("Infinite Analysis: Off", key="-INFINITE-"),
+                sg.Text("Lines:"),
+                sg.Spin(list(range(1, 6)), initial_value=3, key="-MULTIPV-", enable_events=True, size=(3, 1))
+            ],
+            [sg.Multiline("", size=(60, 6), key="-ANALYSIS-PANEL-", disabled=True)],
             [sg.Text("Move List:")],
             [sg.Listbox(values=[], size=(60, 10), key='-MOVE-LIST-', enable_events=True)],
         ]
 
         control_window = sg.Window("Analysis Controls", control_layout, finalize=True)
+        move_list = MoveList(control_window['-MOVE-LIST-'])
+        # Engine searches run here and come back as -ENGINE-RESULT- events on the control window
+        engine_worker = EngineWorker(control_window)
+        infinite_analysis = InfiniteAnalysis(control_window)
+        autoplay_timer = EventTimer(control_window, "-AUTOPLAY-TICK-")
+        # Legal moves and game status of the positions along the board's move stack
+        positions = PositionCache()
+
+        def schedule_autoplay():
+            # Requests the next autoplay move once the interval has passed, the move itself arrives
+            # later as an 'autoplay' engine result. A timer event wakes the loop when a move is due.
+            nonlocal autoplay, last_autoplay_time
+            if not autoplay or engine_worker.is_busy('autoplay'):
+                autoplay_timer.cancel()
+                return
+            remaining = last_autoplay_time + 1.0 / autoplay_speed - time.time()
+            if remaining > 0:
+                autoplay_timer.start(remaining)
+                return
+            info = positions.get(board)
+            if not info.is_game_over and not game_over:
+                if not info.has_both_kings:
+                    sg.popup("A king is missing from the board. Autoplay stopped.")
+                    autoplay = False
+                    control_window["-AUTOPLAY-"].update("Autoplay: Off")
+                    return
+                engine = get_analysis_engine(selected_engine)
+                position = board.copy()
+                engine_worker.submit('autoplay', lambda cancel, engine=engine, position=position: (
+                    position.fen(), engine, engine.play(position, chess.engine.Limit(depth=20), cancel=cancel)))
+            else:
+                autoplay = False
+                control_window["-AUTOPLAY-"].update("Autoplay: Off")
+                sg.popup("Autoplay stopped: Game over.")
+                last_autoplay_time = time.time()
 
         # Function to update the board and controls
         def update_board_and_controls(highlight_squares=None):
@@ -1002,21 +3394,12 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
                 board_window, board, player_side=player_side, highlighted_squares=highlight_squares
             )
             control_window["-FEN-"].update(board.fen())
+            # Restarts the infinite analysis if the position changed
+            infinite_analysis.follow(board)
 
-            # Build move list
-            moves = []
-            node = game
-            while node != current_node and node.variations:
-                next_node = node.variations[0]
-                try:
-                    move_san = node.board().san(next_node.move)
-                except Exception:
-                    move_san = next_node.move.uci()
-                moves.append(move_san)
-                node = next_node
-            control_window['-MOVE-LIST-'].update(moves)
-            if moves:
-                control_window['-MOVE-LIST-'].set_value([moves[-1]])
+            # Show the line through the current position and select the current move
+            move_list.sync(line_end(current_node))
+            move_list.select(current_node)
 
         update_board_and_controls()
 
@@ -1038,7 +3421,8 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
                     update_board_and_controls()
                     return False
 
-                # Apply the move
+                # Apply the move, anything the engine was working on belongs to the previous position
+                engine_worker.cancel()
                 board.push(move)
                 move_history.append(move)
                 current_move_index += 1
@@ -1096,7 +3480,7 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
                 return
 
             while True:
-                board_event, _ = board_window.read(timeout=100)
+                board_event, _ = board_window.read()
 
                 if board_event == sg.WIN_CLOSED:
                     break
@@ -1134,50 +3518,112 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
                 sg.popup(f'Game over. Result: {result}. Winner: {winner}')
                 break
 
-            window, event, values = sg.read_all_windows(timeout=100)
+            # Blocks until there is input, an engine result, an analysis update or an autoplay tick
+            window, event, values = sg.read_all_windows()
             if event in (sg.WIN_CLOSED, "-QUIT-"):
                 break
 
+            if window == control_window and event == infinite_analysis.event_key:
+                fen, text = values[event]
+                if fen == board.fen():
+                    control_window["-ANALYSIS-PANEL-"].update(text)
+                continue
+
+            # Engine results
+            if window == control_window and event == engine_worker.event_key:
+                tag, result, error = values[event]
+                engine_worker.finish(tag)
+                if error is not None:
+                    sg.popup_error(f"Engine error: {error}")
+                    if tag == 'autoplay':
+                        autoplay = False
+                        control_window["-AUTOPLAY-"].update("Autoplay: Off")
+                    infinite_analysis.resume(board)
+                    continue
+                fen, engine, answer = result
+                if fen != board.fen():
+                    # The position changed while the engine was thinking
+                    continue
+                # The search may have interrupted the infinite analysis of this position
+                infinite_analysis.resume(board)
+                if tag == 'analyze':
+                    best_move = answer.get('pv', [None])[0]
+                    highlight = {best_move.from_square, best_move.to_square} if best_move else None
+                    update_board_and_controls(highlight_squares=highlight)
+                    control_window["-CACHE-STATS-"].update(f"Cache: {engine.analysis_cache.stats()}")
+                elif tag == 'autoplay':
+                    move = answer.move
+                    if move is not None:
+                        if is_pawn_promotion(move, board) and move.promotion is None:
+                            # Set default promotion to Queen
+                            move.promotion = chess.QUEEN
+                        make_move(move)
+                    else:
+                        autoplay = False
+                        control_window["-AUTOPLAY-"].update("Autoplay: Off")
+                        sg.popup("Autoplay stopped: No valid moves available.")
+                    last_autoplay_time = time.time()
+                    schedule_autoplay()
+                continue
+
             # Control window events
             if window == control_window:
+                if event in ("-ENGINE-", "-NEXT-", ">", "-PREV-", "<", "-START-", "-END-", "-SUMMON-",
+                             "-RESET-", "-SET-FEN-", "-MOVE-LIST-"):
+                    # The position or engine is about to change, stop searches for the current one
+                    engine_worker.cancel()
+
                 if event == "-ENGINE-":
                     selected_engine = values['-ENGINE-']
-                elif event == "-ANALYZE-":
+                    get_analysis_engine(selected_engine).start()
+                    if infinite_analysis.enabled:
+                        infinite_analysis.start(get_analysis_engine(selected_engine), board, infinite_analysis.multipv)
+                elif event in ("-INFINITE-", "-MULTIPV-"):
+                    if event == "-INFINITE-" and infinite_analysis.enabled:
+                        infinite_analysis.stop(disable=True)
+                    elif event == "-INFINITE-" or infinite_analysis.enabled:
+                        if not has_both_kings(board):
+                            sg.popup("Cannot analyze an invalid board position. Ensure both kings are present.")
+                            continue
+                        infinite_analysis.start(get_analysis_engine(selected_engine), board, int(values["-MULTIPV-"]))
+                    control_window["-INFINITE-"].update(f"Infinite Analysis: {'On' if infinite_analysis.enabled else 'Off'}")
+                    if not infinite_analysis.enabled:
+                        control_window["-ANALYSIS-PANEL-"].update("")
+                elif event in ("-ANALYZE-", "-HINT-"):
                     if not has_both_kings(board):
-                        sg.popup("Cannot analyze an invalid board position. Ensure both kings are present.")
+                        if event == "-ANALYZE-":
+                            sg.popup("Cannot analyze an invalid board position. Ensure both kings are present.")
+                        else:
+                            sg.popup("Cannot provide a hint on an invalid board position. Ensure both kings are present.")
                         continue
-                    engine = engines[selected_engine]
-                    result = engine.analyse(board, chess.engine.Limit(time=0.1))
-                    best_move = result.get('pv', [None])[0]
-                    highlight = {best_move.from_square, best_move.to_square} if best_move else None
-                    update_board_and_controls(highlight_squares=highlight)
-                elif event == "-HINT-":
-                    if not has_both_kings(board):
-                        sg.popup("Cannot provide a hint on an invalid board position. Ensure both kings are present.")
+                    best_move = infinite_analysis.best_move(board)
+                    if best_move is not None:
+                        # The running infinite analysis already knows the best move, no need for another search
+                        update_board_and_controls(highlight_squares={best_move.from_square, best_move.to_square})
                         continue
-                    engine = engines[selected_engine]
-                    result = engine.analyse(board, chess.engine.Limit(time=0.1))
-                    best_move = result.get('pv', [None])[0]
-                    highlight = {best_move.from_square, best_move.to_square} if best_move else None
-                    update_board_and_controls(highlight_squares=highlight)
+                    engine = get_analysis_engine(selected_engine)
+                    # Searches work on a copy so the board can change while the engine thinks
+                    position = board.copy()
+                    engine_worker.submit('analyze', lambda cancel, engine=engine, position=position: (
+                        position.fen(), engine, engine.analyse(position, chess.engine.Limit(time=0.1), cancel=cancel)))
                 elif event in ("-NEXT-", ">"):
                     if current_node.variations:
+                        board = goto_node(board, current_node, current_node.variations[0])
                         current_node = current_node.variations[0]
-                        board = current_node.board()
                         update_board_and_controls()
                 elif event in ("-PREV-", "<"):
                     if current_node.parent:
+                        board = goto_node(board, current_node, current_node.parent)
                         current_node = current_node.parent
-                        board = current_node.board()
                         update_board_and_controls()
                 elif event == "-START-":
+                    board = goto_node(board, current_node, game)
                     current_node = game
-                    board = current_node.board()
                     update_board_and_controls()
                 elif event == "-END-":
-                    while current_node.variations:
-                        current_node = current_node.variations[0]
-                    board = current_node.board()
+                    end_node = line_end(current_node)
+                    board = goto_node(board, current_node, end_node)
+                    current_node = end_node
                     update_board_and_controls()
                 elif event == "-AUTOPLAY-":
                     autoplay = not autoplay
@@ -1217,24 +3663,11 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
                     except ValueError as e:
                         sg.popup_error(f"Invalid FEN string: {e}")
                 elif event == '-MOVE-LIST-':
-                    selected_moves = values['-MOVE-LIST-']
-                    if selected_moves:
-                        current_node = game
-                        board = current_node.board()
-                        for move_san in selected_moves:
-                            found = False
-                            for variation in current_node.variations:
-                                try:
-                                    san = current_node.board().san(variation.move)
-                                except Exception:
-                                    san = variation.move.uci()
-                                if san == move_san:
-                                    current_node = variation
-                                    board = current_node.board()
-                                    found = True
-                                    break
-                            if not found:
-                                break
+                    selected_indexes = control_window['-MOVE-LIST-'].get_indexes()
+                    node = move_list.node_at(selected_indexes[0]) if selected_indexes else None
+                    if node is not None:
+                        board = goto_node(board, current_node, node)
+                        current_node = node
                         update_board_and_controls()
                 elif event == "-ILLEGAL-MOVES-":
                     allow_illegal_moves = not allow_illegal_moves
@@ -1269,10 +3702,7 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
                                 # Highlight all squares
                                 highlight_squares = set(chess.SQUARES)
                             else:
-                                legal_moves = [
-                                    move for move in board.legal_moves if move.from_square == square
-                                ]
-                                highlight_squares = {move.to_square for move in legal_moves}
+                                highlight_squares = positions.get(board).targets.get(square, set())
                             update_board_and_controls(highlight_squares=highlight_squares)
                         else:
                             # Deselect if clicking on an empty square or opponent's piece
@@ -1282,6 +3712,7 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
                         # Attempt to move the selected piece
                         if allow_illegal_moves:
                             # Move the piece directly
+                            engine_worker.cancel()
                             piece = board.piece_at(selected_square)
                             board.remove_piece_at(selected_square)
                             board.set_piece_at(square, piece)
@@ -1294,11 +3725,8 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
                             selected_square = None
                             update_board_and_controls()
                         else:
-                            # Generate all legal moves from selected_square to square
-                            possible_moves = [
-                                m for m in board.legal_moves
-                                if m.from_square == selected_square and m.to_square == square
-                            ]
+                            # All legal moves from selected_square to square
+                            possible_moves = positions.get(board).moves.get((selected_square, square), [])
                             if not possible_moves:
                                 # No legal moves to that square
                                 selected_square = None
@@ -1337,44 +3765,647 @@ def analyze_position(fen_or_pgn_input, main_window, engines, analysis_path, game
                                             selected_square = None
                                             update_board_and_controls()
 
-            # Autoplay logic
-            if autoplay and (time.time() - last_autoplay_time) >= (1.0 / autoplay_speed):
-                if not board.is_game_over() and not game_over:
-                    if not has_both_kings(board):
-                        sg.popup("A king is missing from the board. Autoplay stopped.")
-                        autoplay = False
-                        control_window["-AUTOPLAY-"].update("Autoplay: Off")
-                        continue
-                    engine = engines[selected_engine]
-                    result = engine.play(board, chess.engine.Limit(depth=20))
-                    move = result.move
-                    if move is not None:
-                        if is_pawn_promotion(move, board) and move.promotion is None:
-                            # Set default promotion to Queen
-                            move.promotion = chess.QUEEN
-                        make_move(move)
-                    else:
-                        autoplay = False
-                        control_window["-AUTOPLAY-"].update("Autoplay: Off")
-                        sg.popup("Autoplay stopped: No valid moves available.")
-                else:
-                    autoplay = False
-                    control_window["-AUTOPLAY-"].update("Autoplay: Off")
-                    sg.popup("Autoplay stopped: Game over.")
-                last_autoplay_time = time.time()
+            schedule_autoplay()
 
         # Close windows and save game
+        autoplay_timer.cancel()
+        engine_worker.close()
         board_window.close()
         control_window.close()
         save_game(game, analysis_path, allow_save=True)
 
     except Exception as e:
         sg.popup_error(f"Error during position analysis: {e}")
+    finally:
+        if autoplay_timer is not None:
+            autoplay_timer.cancel()
+        if infinite_analysis is not None:
+            infinite_analysis.stop(disable=True)
+        if engine_worker is not None:
+            engine_worker.close()
+        for name, instance in analysis_engines.items():
+            engines[name].release(instance)
+
+# Headless tournament mode. Each worker process gets its own lazily started engines, so a worker
+# only launches the engine types it is actually asked to play with.
+_worker_engines = None
+
+def _quit_worker_engines():
+    global _worker_engines
+    if _worker_engines:
+        for engine in _worker_engines.values():
+            engine.quit()
+    _worker_engines = None
+    EVAL_STORE.close()
+
+def _tournament_worker_init():
+    global _worker_engines
+    _worker_engines = get_engines(preload=())
+    multiprocessing.util.Finalize(None, _quit_worker_engines, exitpriority=10)
+
+def play_headless_game(white, black, white_name, black_name, max_plies=TOURNAMENT_MAX_PLIES, time_control=None):
+    """
+    Plays a complete game between two CustomEngines without any GUI and returns it as a PGN game.
+    With a TimeControl the engines play on a clock and a side that runs out of time loses.
+    """
+    board = chess.Board()
+    game = chess.pgn.Game()
+    game.headers["Event"] = "Chessli Tournament"
+    game.headers["Date"] = time.strftime("%Y.%m.%d")
+    game.headers["White"] = white_name
+    game.headers["Black"] = black_name
+    node = game
+    clock = ChessClock(time_control) if time_control is not None else None
+    if clock is not None:
+        game.headers["TimeControl"] = time_control.pgn_header()
+        clock.run(board.turn, increment=False)
+
+    while not board.is_game_over(claim_draw=True) and len(board.move_stack) < max_plies:
+        current_engine = white if board.turn == chess.WHITE else black
+        move = current_engine.play(board, clock=clock)
+        if move is None or move not in board.legal_moves:
+            # An engine that cannot produce a legal move forfeits
+            game.headers["Result"] = "0-1" if board.turn == chess.WHITE else "1-0"
+            game.headers["Termination"] = "illegal move"
+            return game
+        board.push(move)
+        node = node.add_variation(move)
+        set_search_comments(node, current_engine.last_move_time, current_engine.last_info)
+        if clock is not None:
+            clock.run(board.turn)
+            clock_left = clock.time_left(not board.turn)
+            node.set_clock(max(clock_left, 0.0))
+            if clock_left <= 0:
+                game.headers["Result"] = time_forfeit_result(board, not board.turn)
+                game.headers["Termination"] = "time forfeit"
+                return game
+
+    if board.is_game_over(claim_draw=True):
+        game.headers["Result"] = board.result(claim_draw=True)
+    else:
+        game.headers["Result"] = "1/2-1/2"
+        game.headers["Termination"] = "adjudication"
+    return game
+
+def _play_tournament_game(task):
+    round_number, (white_engine, white_difficulty), (black_engine, black_difficulty), max_plies, time_control = task
+    start = time.perf_counter()
+    latency = LatencyStats()
+    telemetry = EngineTelemetry()
+    with _worker_engines[white_engine].instance() as white_instance, _worker_engines[black_engine].instance() as black_instance:
+        # Engine startup is not part of the move times. Levels using the built-in search never start one.
+        if needs_engine(white_difficulty):
+            white_instance.start().result()
+        if needs_engine(black_difficulty):
+            black_instance.start().result()
+        white = CustomEngine(white_instance, white_difficulty, latency=latency, telemetry=telemetry)
+        black = CustomEngine(black_instance, black_difficulty, latency=latency, telemetry=telemetry)
+        game = play_headless_game(white, black, f"{white_engine} ({white_difficulty})",
+                                  f"{black_engine} ({black_difficulty})", max_plies=max_plies,
+                                  time_control=time_control)
+    game.headers["Round"] = str(round_number)
+    plies = len(list(game.mainline_moves()))
+    return (task, str(game), game.headers["Result"], plies, time.perf_counter() - start,
+            latency.samples(), list(telemetry.records))
+
+def run_tournament(players, rounds=1, workers=None, save_path=ENGINE_VS_ENGINE_PATH, max_plies=TOURNAMENT_MAX_PLIES,
+                   time_control=None):
+    """
+    Plays a round robin between (engine name, difficulty) players across a process pool.
+    Every pairing is played `rounds` times with alternating colors. All games are written to one
+    PGN file in save_path and the standings are returned as {player: {games, wins, draws, losses, points}}.
+    With a TimeControl every game is played on a clock, which bounds how long the tournament takes.
+    """
+    players = [tuple(player) for player in players]
+    for engine_name, difficulty in players:
+        if engine_name not in ENGINE_CONFIGS:
+            raise ValueError(f"Unknown engine: {engine_name}")
+        if difficulty not in DIFFICULTY_LEVELS:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+
+    tasks = []
+    for round_number in range(1, rounds + 1):
+        for i, first in enumerate(players):
+            for second in players[i + 1:]:
+                white, black = (first, second) if round_number % 2 else (second, first)
+                tasks.append((round_number, white, black, max_plies, time_control))
+
+    def label(player):
+        return f"{player[0]} ({player[1]})"
+
+    standings = {label(player): {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'points': 0.0} for player in players}
+    os.makedirs(save_path, exist_ok=True)
+    pgn_path = os.path.join(save_path, f"tournament_{time.strftime('%Y%m%d_%H%M%S')}.pgn")
+    latency = LatencyStats(max_samples=None)
+    # Searches from all workers end up in one session log
+    telemetry = EngineTelemetry(TELEMETRY_PATH, max_records=None)
+
+    with open(pgn_path, 'w') as pgn_file, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_tournament_worker_init) as executor:
+        futures = [executor.submit(_play_tournament_game, task) for task in tasks]
+        for finished, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+            (round_number, white, black, _, _), pgn_text, result, plies, elapsed, samples, records = future.result()
+            latency.merge(samples)
+            for row in records:
+                telemetry.add(row)
+            pgn_file.write(pgn_text + "\n\n")
+            pgn_file.flush()
+
+            white_points = {'1-0': 1.0, '0-1': 0.0}.get(result, 0.5)
+            for player, points in ((label(white), white_points), (label(black), 1.0 - white_points)):
+                entry = standings[player]
+                entry['games'] += 1
+                entry['points'] += points
+                entry['wins' if points == 1.0 else 'losses' if points == 0.0 else 'draws'] += 1
+            print(f"[{finished}/{len(tasks)}] Round {round_number}: {label(white)} vs {label(black)} "
+                  f"{result} in {plies} plies ({elapsed:.1f}s)")
+
+    print(f"Games saved to {pgn_path}")
+    print(f"Move times:\n{latency.report()}")
+    telemetry.close()
+    print(f"Engine searches:\n{telemetry.report()}")
+    if telemetry.folder is not None and telemetry.records:
+        print(f"Search log saved to {telemetry.log_path('csv')}")
+    return standings
+
+def format_tournament_table(standings):
+    rows = sorted(standings.items(), key=lambda item: item[1]['points'], reverse=True)
+    width = max([len("Player")] + [len(player) for player in standings])
+    lines = [f"{'Player':<{width}}  Games   +   =   -  Points  Score",
+             "-" * (width + 41)]
+    for player, entry in rows:
+        score = 100.0 * entry['points'] / entry['games'] if entry['games'] else 0.0
+        lines.append(f"{player:<{width}}  {entry['games']:>5} {entry['wins']:>3} {entry['draws']:>3} "
+                     f"{entry['losses']:>3}  {entry['points']:>6.1f}  {score:>4.0f}%")
+    return "\n".join(lines)
+
+def parse_player(text):
+    # "Stockfish:Hard" -> ('Stockfish', 'Hard')
+    engine_name, _, difficulty = text.partition(':')
+    return engine_name, difficulty or 'Impossible'
+
+# Bulk PGN annotation. Games are streamed from the input files and annotated by a pool of worker
+# processes, each with its own engine instance; at most a few games are held in memory at a time.
+_annotation_engine = None
+
+def _annotation_worker_init(engine_name):
+    global _annotation_engine
+    _tournament_worker_init()
+    _annotation_engine = _worker_engines[engine_name].acquire()
+    # Started here so an engine that cannot run fails the pool instead of every game
+    _annotation_engine.start().result()
+
+def iter_pgn_games(paths):
+    """
+    Yields (path, game number, PGN text) for every game in the given PGN files, one game at a time.
+    """
+    for path in paths:
+        with open(path, 'r', errors='replace') as pgn_file:
+            number = 0
+            while True:
+                game = chess.pgn.read_game(pgn_file)
+                if game is None:
+                    break
+                number += 1
+                yield path, number, str(game)
+
+def classify_move(loss):
+    # Centipawn loss of a move from the mover's point of view -> (NAG, label) or None
+    if loss >= BLUNDER_THRESHOLD:
+        return chess.pgn.NAG_BLUNDER, "Blunder"
+    if loss >= MISTAKE_THRESHOLD:
+        return chess.pgn.NAG_MISTAKE, "Mistake"
+    if loss >= INACCURACY_THRESHOLD:
+        return chess.pgn.NAG_DUBIOUS_MOVE, "Inaccuracy"
+    return None
+
+def evaluate_position(engine, board, limit):
+    # Terminal positions are scored directly instead of asking the engine
+    if board.is_checkmate():
+        return {'score': chess.engine.PovScore(chess.engine.MateGiven, not board.turn), 'pv': []}
+    if board.is_game_over(claim_draw=True):
+        return {'score': chess.engine.PovScore(chess.engine.Cp(0), board.turn), 'pv': []}
+    return engine.analyse(board, limit)
+
+def annotate_game(game, engine, limit, engine_name=None):
+    """
+    Adds [%eval] tags to every move of the mainline, plus NAGs and a comment with the engine's
+    preferred move for inaccuracies, mistakes and blunders.
+    """
+    board = game.board()
+    info = evaluate_position(engine, board, limit)
+    for node in game.mainline():
+        mover = board.turn
+        best_score = info['score'].pov(mover).score(mate_score=MATE_SCORE)
+        best_move = info['pv'][0] if info.get('pv') else None
+        best_san = board.san(best_move) if best_move is not None else None
+        board.push(node.move)
+
+        info = evaluate_position(engine, board, limit)
+        node.set_eval(info['score'], info.get('depth'))
+        loss = best_score - info['score'].pov(mover).score(mate_score=MATE_SCORE)
+        classification = classify_move(loss) if node.move != best_move else None
+        if classification is not None:
+            nag, label = classification
+            node.nags.add(nag)
+            comment = f"{label}." + (f" {best_san} was best." if best_san else "")
+            node.comment = f"{comment} {node.comment}".strip()
+
+    if engine_name:
+        game.headers["Annotator"] = f"Chessli ({engine_name})"
+    return game
+
+def _annotate_pgn_game(task):
+    path, number, pgn_text, engine_name, limit = task
+    game = chess.pgn.read_game(io.StringIO(pgn_text))
+    try:
+        annotate_game(game, _annotation_engine, limit, engine_name)
+    except Exception as e:
+        return path, number, pgn_text, str(e)
+    return path, number, str(game), None
+
+def annotate_pgn_files(paths, engine_name='Stockfish', limit=None, workers=None, output_path=ANALYSIS_PATH):
+    """
+    Annotates every game of the given PGN files across a process pool and writes
+    <name>_annotated.pgn files to output_path, keeping the input order. Returns the written paths.
+    """
+    if engine_name not in ENGINE_CONFIGS:
+        raise ValueError(f"Unknown engine: {engine_name}")
+    limit = limit or chess.engine.Limit(time=0.1)
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_path, exist_ok=True)
+
+    written = []
+    names = set()
+    output_file = None
+    current_path = None
+
+    def write(result):
+        nonlocal output_file, current_path
+        path, number, pgn_text, error = result
+        if path != current_path:
+            if output_file:
+                output_file.close()
+            # Files with the same name from different folders get numbered outputs, games_2 and so on
+            base = name = os.path.splitext(os.path.basename(path))[0]
+            count = 1
+            while name in names:
+                count += 1
+                name = f"{base}_{count}"
+            names.add(name)
+            written.append(os.path.join(output_path, f"{name}_annotated.pgn"))
+            output_file = open(written[-1], 'w')
+            current_path = path
+        if error:
+            print(f"{os.path.basename(path)} game {number}: not annotated ({error})")
+        output_file.write(pgn_text + "\n\n")
+        print(f"{os.path.basename(path)}: annotated game {number}")
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_annotation_worker_init,
+                                                    initargs=(engine_name,)) as executor:
+            # Results are written in submission order; a few games per worker keep every worker busy
+            pending = collections.deque()
+            for path, number, pgn_text in iter_pgn_games(paths):
+                pending.append(executor.submit(_annotate_pgn_game, (path, number, pgn_text, engine_name, limit)))
+                if len(pending) >= workers * ANNOTATION_GAMES_PER_WORKER:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    except concurrent.futures.BrokenExecutor:
+        raise RuntimeError(f"The annotation workers could not start {engine_name} "
+                           f"({ENGINE_CONFIGS[engine_name]['path']}).")
+    finally:
+        if output_file:
+            output_file.close()
+    return written
+
+# Game reports. Evaluations are gathered once per game into a (games x positions) array and every
+# statistic is computed on whole arrays, so reports over thousands of games take seconds.
+class EvalVisitor(chess.pgn.BaseVisitor):
+    """
+    Reads the headers and the [%eval] of every mainline position of a game without building a game tree.
+    Variations are skipped. With keep_boards a copy of every position is kept, so positions without an
+    evaluation can be searched afterwards.
+    """
+    def __init__(self, keep_boards=False):
+        self.keep_boards = keep_boards
+        self.headers = {}
+        self.evals = []  # centipawns from White's point of view, NaN where unknown
+        self.boards = []
+        self.board = None
+
+    def visit_header(self, tagname, tagvalue):
+        self.headers[tagname] = tagvalue
+
+    def visit_board(self, board):
+        # Called for the start position and after every move
+        if self.board is None:
+            self.white_first = board.turn == chess.WHITE
+        self.board = board
+        self.evals.append(float('nan'))
+        if self.keep_boards:
+            self.boards.append(board.copy())
+
+    def visit_comment(self, comment):
+        match = chess.pgn.EVAL_REGEX.search(comment)
+        if match is None or self.board is None or not math.isnan(self.evals[-1]):
+            return
+        if match.group("mate"):
+            mate = int(match.group("mate"))
+            # Mate 0 means the side to move has been mated
+            score = chess.engine.Mate(mate) if mate else chess.engine.MateGiven
+            if not mate and self.board.turn == chess.WHITE:
+                score = -score
+        else:
+            score = chess.engine.Cp(round(float(match.group("cp")) * 100))
+        self.evals[-1] = score.score(mate_score=MATE_SCORE)
+
+    def begin_variation(self):
+        return chess.pgn.SKIP
+
+    def result(self):
+        return self
+
+def iter_game_evaluations(paths, engine=None, limit=None):
+    """
+    Yields (source file, headers, White moves first, evaluations) for every game of the given PGN files;
+    folders are searched for .pgn files. The evaluations cover every mainline position, the start position
+    included, in centipawns from White's point of view. [%eval] tags are used where present. Other
+    positions are searched with engine if one is given and are NaN otherwise, except a final mate or draw.
+    """
+    limit = limit or chess.engine.Limit(time=0.1)
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith('.pgn')))
+        else:
+            files.append(path)
+    for path in files:
+        with open(path, 'r', errors='replace') as pgn_file:
+            while True:
+                game = chess.pgn.read_game(pgn_file, Visitor=lambda: EvalVisitor(keep_boards=engine is not None))
+                if game is None:
+                    break
+                if game.board is None:
+                    continue
+                evals = game.evals
+                if engine is not None:
+                    for ply, board in enumerate(game.boards):
+                        if math.isnan(evals[ply]):
+                            evals[ply] = evaluate_position(engine, board, limit)['score'].white().score(mate_score=MATE_SCORE)
+                elif math.isnan(evals[-1]) and game.board.is_game_over():
+                    evals[-1] = evaluate_position(None, game.board, limit)['score'].white().score(mate_score=MATE_SCORE)
+                yield os.path.basename(path), game.headers, game.white_first, evals
+
+class GameReport:
+    """
+    Per-move and per-game statistics over evals, a (games x positions) array of evaluations from White's
+    point of view padded with NaN. Move i of a game leads from position i - 1 to position i. Moves with an
+    unknown evaluation on either side are left out of every statistic.
+    """
+    ERRORS = (("inaccuracies", 1), ("mistakes", 2), ("blunders", 3))
+
+    def __init__(self, headers, evals, white_first, plies):
+        self.headers = headers  # PGN headers of every game, plus its source file
+        self.evals = evals
+        self.white_first = white_first  # False for games that start with Black to move
+        self.plies = plies
+        # White's winning chances in percent
+        self.win_probability = 100.0 / (1.0 + np.exp(-WIN_PROBABILITY_SLOPE * evals))
+
+        before, after = evals[:, :-1], evals[:, 1:]
+        self.known = ~np.isnan(before) & ~np.isnan(after)
+        ply = np.arange(evals.shape[1] - 1)
+        self.white_moves = (ply[np.newaxis, :] % 2 == 0) == white_first[:, np.newaxis]
+        sign = np.where(self.white_moves, 1.0, -1.0)
+
+        capped = np.clip(evals, -ACPL_EVAL_CAP, ACPL_EVAL_CAP)
+        self.loss = np.where(self.known, np.maximum(sign * (capped[:, :-1] - capped[:, 1:]), 0.0), 0.0)
+        # Lichess' move accuracy from the drop in the mover's winning chances
+        drop = np.where(self.known, np.maximum(sign * (self.win_probability[:, :-1] - self.win_probability[:, 1:]), 0.0), 0.0)
+        self.accuracy = np.clip(103.1668 * np.exp(-0.04354 * drop) - 3.1669, 0.0, 100.0)
+        # 0 good, 1 inaccuracy, 2 mistake, 3 blunder, on the same thresholds as annotate
+        self.classification = np.where(self.known, np.digitize(
+            self.loss, [INACCURACY_THRESHOLD, MISTAKE_THRESHOLD, BLUNDER_THRESHOLD]), 0)
+
+    @classmethod
+    def from_files(cls, paths, engine=None, limit=None):
+        """
+        Builds a report over every game of the given PGN files and folders, see iter_game_evaluations().
+        """
+        if np is None:
+            raise RuntimeError("Game reports need NumPy, install it with pip install numpy")
+        headers, rows, white_first = [], [], []
+        for source, game_headers, game_white_first, evals in iter_game_evaluations(paths, engine, limit):
+            headers.append(dict(game_headers, Source=source))
+            rows.append(evals)
+            white_first.append(game_white_first)
+        if not rows:
+            raise ValueError("No games to report on")
+        evals = np.full((len(rows), max(len(row) for row in rows)), np.nan)
+        for number, row in enumerate(rows):
+            evals[number, :len(row)] = row
+        return cls(headers, evals, np.array(white_first), np.array([len(row) - 1 for row in rows]))
+
+    def _side_mask(self, white):
+        return self.known & (self.white_moves if white else ~self.white_moves)
+
+    def game_table(self):
+        """
+        One row per game: players, result, moves, and each side's ACPL, accuracy and error counts.
+        """
+        columns = {}
+        for side, white in (("white", True), ("black", False)):
+            mask = self._side_mask(white)
+            moves = mask.sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                columns[f"{side}_acpl"] = np.where(mask, self.loss, 0.0).sum(axis=1) / moves
+                columns[f"{side}_accuracy"] = np.where(mask, self.accuracy, 0.0).sum(axis=1) / moves
+            columns[f"{side}_moves"] = moves
+            for name, level in self.ERRORS:
+                columns[f"{side}_{name}"] = ((self.classification == level) & mask).sum(axis=1)
+        rows = []
+        for number, headers in enumerate(self.headers):
+            row = {'game': number + 1, 'source': headers['Source'], 'white': headers.get('White', '?'),
+                   'black': headers.get('Black', '?'), 'result': headers.get('Result', '*'),
+                   'plies': int(self.plies[number])}
+            for name, values in columns.items():
+                value = values[number]
+                if values.dtype.kind != 'f':
+                    row[name] = int(value)
+                else:
+                    row[name] = None if np.isnan(value) else round(float(value), 1)
+            rows.append(row)
+        return rows
+
+    def player_table(self):
+        """
+        Totals per player over all games: moves, ACPL, accuracy and error counts.
+        """
+        names = np.array([[headers.get('White', '?'), headers.get('Black', '?')] for headers in self.headers])
+        # The player behind every move, grouped with one bincount per statistic
+        movers = np.where(self.white_moves, names[:, :1], names[:, 1:])[self.known]
+        players, index = np.unique(movers, return_inverse=True)
+        moves = np.bincount(index, minlength=len(players))
+        loss = np.bincount(index, weights=self.loss[self.known], minlength=len(players))
+        accuracy = np.bincount(index, weights=self.accuracy[self.known], minlength=len(players))
+        classification = self.classification[self.known]
+        errors = {name: np.bincount(index[classification == level], minlength=len(players)) for name, level in self.ERRORS}
+        rows = []
+        for number, player in enumerate(players):
+            row = {'player': str(player), 'moves': int(moves[number]),
+                   'acpl': round(float(loss[number] / moves[number]), 1),
+                   'accuracy': round(float(accuracy[number] / moves[number]), 1)}
+            row.update({name: int(counts[number]) for name, counts in errors.items()})
+            rows.append(row)
+        return sorted(rows, key=lambda row: row['moves'], reverse=True)
+
+    def text(self):
+        lines = [f"{len(self.headers)} games, {int(self.known.sum())} evaluated moves"]
+        for row in self.player_table():
+            lines.append(f"{row['player']}: {row['moves']} moves, ACPL {row['acpl']}, accuracy {row['accuracy']}%, "
+                         f"{row['inaccuracies']} inaccuracies, {row['mistakes']} mistakes, {row['blunders']} blunders")
+        return "\n".join(lines)
+
+    def save(self, folder=REPORT_PATH):
+        """
+        Writes the evaluation and win probability arrays as .npy files and the game and player tables as
+        CSV files, all under one timestamped name. Returns the written paths.
+        """
+        os.makedirs(folder, exist_ok=True)
+        stem = os.path.join(folder, f"report_{time.strftime('%Y%m%d_%H%M%S')}")
+        np.save(f"{stem}_evals.npy", self.evals)
+        np.save(f"{stem}_win_probability.npy", self.win_probability)
+        written = [f"{stem}_evals.npy", f"{stem}_win_probability.npy"]
+        for name, rows in (("games", self.game_table()), ("players", self.player_table())):
+            written.append(f"{stem}_{name}.csv")
+            with open(written[-1], 'w', newline='') as csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=list(rows[0]) if rows else [])
+                writer.writeheader()
+                writer.writerows(rows)
+        return written
+
+def create_game_report(paths, engines=None, engine_name=None, limit=None):
+    # Positions without an [%eval] tag are searched with an instance of engine_name, if given
+    if engine_name is None:
+        return GameReport.from_files(paths)
+    with engines[engine_name].instance() as engine:
+        return GameReport.from_files(paths, engine, limit)
+
+def show_game_report(engines):
+    try:
+        layout = [
+            [sg.Text("PGN file or folder:"), sg.InputText(HUMAN_VS_ENGINE_PATH, key='Path', size=(40, 1)),
+             sg.FolderBrowse(target='Path'), sg.FileBrowse(target='Path', file_types=(("PGN Files", "*.pgn"),))],
+            [sg.Text("Evaluate moves without [%eval] with:"),
+             sg.Combo(["None"] + list(engines.keys()), key='Engine', default_value='None', readonly=True)],
+            [sg.Button('Create Report', key='Create')]
+        ]
+        event, values = sg.Window('Game Report', layout).read(close=True)
+        if event != 'Create' or not values['Path']:
+            return
+        engine_name = values['Engine'] if values['Engine'] != "None" else None
+        report = create_game_report([values['Path']], engines, engine_name, chess.engine.Limit(time=0.1))
+        saved = report.save()
+        sg.popup_scrolled(report.text() + "\n\nSaved to:\n" + "\n".join(saved), title="Game Report")
+    except Exception as e:
+        sg.popup_error(f"Error creating the game report: {e}")
+
+def run_cli(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="Chessli", description="Headless Chessli tools. Run without arguments for the GUI.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    tournament_parser = subparsers.add_parser("tournament", help="Play a round robin between engines/difficulties")
+    tournament_parser.add_argument("players", nargs="+", metavar="ENGINE:DIFFICULTY",
+                                   help=f"e.g. Stockfish:Hard. Engines: {', '.join(ENGINE_CONFIGS)}. "
+                                        f"Difficulties: {', '.join(DIFFICULTY_LEVELS)}")
+    tournament_parser.add_argument("--rounds", type=int, default=2, help="Games per pairing, colors alternate")
+    tournament_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    tournament_parser.add_argument("--max-plies", type=int, default=TOURNAMENT_MAX_PLIES, help="Adjudicate a draw after this many plies")
+    tournament_parser.add_argument("--output", default=ENGINE_VS_ENGINE_PATH, help="Folder for the tournament PGN")
+    tournament_parser.add_argument("--time-control", default=None, metavar="MINUTES+SECONDS",
+                                   help="Play every game on a clock, e.g. 1+0.5 (default: the difficulty's move time)")
+    tournament_parser.add_argument("--increment-mode", default="Fischer", choices=INCREMENT_MODES)
+
+    annotate_parser = subparsers.add_parser("annotate", help="Annotate every game of PGN files with engine evaluations")
+    annotate_parser.add_argument("files", nargs="+", help="PGN files to annotate")
+    annotate_parser.add_argument("--engine", default="Stockfish", choices=list(ENGINE_CONFIGS))
+    annotate_parser.add_argument("--time", type=float, default=None, help="Seconds per position (default 0.1)")
+    annotate_parser.add_argument("--depth", type=int, default=None, help="Search depth per position instead of time")
+    annotate_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    annotate_parser.add_argument("--output", default=ANALYSIS_PATH, help="Folder for the annotated PGNs")
+
+    report_parser = subparsers.add_parser("report", help="Accuracy, ACPL and error statistics of saved games")
+    report_parser.add_argument("paths", nargs="*", default=[HUMAN_VS_ENGINE_PATH], metavar="PATH",
+                               help="PGN files or folders (default: the Human vs Engine games)")
+    report_parser.add_argument("--engine", default=None, choices=list(ENGINE_CONFIGS),
+                               help="Evaluate moves without an [%%eval] tag with this engine (default: leave them out)")
+    report_parser.add_argument("--time", type=float, default=0.1, help="Seconds per evaluated position")
+    report_parser.add_argument("--output", default=REPORT_PATH, help="Folder for the .npy and CSV files")
+
+    evals_parser = subparsers.add_parser("evals", help="Show, prune and compact the stored engine evaluations")
+    evals_parser.add_argument("--max-age", type=float, default=None, metavar="DAYS", help="Delete results older than this")
+    evals_parser.add_argument("--max-size", type=float, default=None, metavar="MB", help="Delete the oldest results until the store fits")
+    evals_parser.add_argument("--path", default=EVAL_STORE_PATH, help="Store file")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "tournament":
+        players = [parse_player(text) for text in args.players]
+        if len(players) < 2:
+            parser.error("a tournament needs at least two players")
+        try:
+            time_control = TimeControl.parse(args.time_control, args.increment_mode)
+            standings = run_tournament(players, rounds=args.rounds, workers=args.workers,
+                                       save_path=args.output, max_plies=args.max_plies, time_control=time_control)
+        except ValueError as e:
+            parser.error(str(e))
+        print(format_tournament_table(standings))
+
+    elif args.command == "annotate":
+        limit = chess.engine.Limit(time=args.time, depth=args.depth) if args.time or args.depth else None
+        try:
+            written = annotate_pgn_files(args.files, engine_name=args.engine, limit=limit,
+                                         workers=args.workers, output_path=args.output)
+        except (RuntimeError, ValueError) as e:
+            parser.error(str(e))
+        for path in written:
+            print(f"Saved {path}")
+
+    elif args.command == "report":
+        engines = get_engines(preload=()) if args.engine else {}
+        try:
+            report = create_game_report(args.paths, engines, args.engine, chess.engine.Limit(time=args.time))
+        except (RuntimeError, ValueError, OSError) as e:
+            parser.error(str(e))
+        finally:
+            for engine in engines.values():
+                engine.quit()
+            EVAL_STORE.close()
+        print(report.text())
+        for path in report.save(args.output):
+            print(f"Saved {path}")
+
+    elif args.command == "evals":
+        store = EvalStore(args.path)
+        try:
+            print(f"Before: {store.summary()}")
+            if args.max_age is not None or args.max_size is not None:
+                print(f"Deleted {store.prune(max_age_days=args.max_age, max_size_mb=args.max_size)} results")
+                print(f"After: {store.summary()}")
+        except sqlite3.Error as e:
+            parser.error(f"cannot open {args.path}: {e}")
+        finally:
+            store.close()
 
 def main():
     try:
         sg.theme('DefaultNoMoreNagging')
         engines = get_engines()
+        SPRITES.load()
         if not engines:
             sg.popup_error("No engines were loaded. Exiting the program.")
             return
@@ -1384,46 +4415,76 @@ def main():
             [sg.Button("Play against an engine", key="HumanVSEngine", size=(30, 2))],
             [sg.Button("Play between two engines", key="EngineVSEngine", size=(30, 2))],
             [sg.Button("Analyze a position", key="Analyze", size=(30, 2))],
-            [sg.Button("Quit", key="Quit", size=(30, 2))]
+            [sg.Button("Game Report", key="GameReport", size=(30, 2))],
+            [sg.Button("Engine Status", key="EngineStatus", size=(30, 2))],
+            [sg.Button("Quit", key="Quit", size=(30, 2))],
+            [sg.Text("Starting engines...", key="-ENGINE-STATUS-", size=(40, 1), justification='center')]
         ]
 
         window = sg.Window("Chess Game", layout, finalize=True, element_justification='c')
 
+        # The menu is usable right away; engines report back here as they finish starting
+        for engine in engines.values():
+            if engine.is_started():
+                engine.start().add_done_callback(lambda _, name=engine.name: window.write_event_value("-ENGINE-READY-", name))
+        # Engines nobody has used for a while are shut down in the background and restart on their next use
+        governor = EngineGovernor(engines, on_stop=lambda names: window.write_event_value("-ENGINE-IDLE-", names))
+        governor.start()
+
         while True:
             event, values = window.read()
 
             if event in (sg.WIN_CLOSED, "Quit"):
                 break
 
+            elif event == "-ENGINE-READY-":
+                starting = [name for name, engine in engines.items() if engine.is_starting()]
+                window["-ENGINE-STATUS-"].update(f"Starting {', '.join(starting)}..." if starting else "Engines ready")
+
+            elif event == "-ENGINE-IDLE-":
+                window["-ENGINE-STATUS-"].update(f"Stopped idle {', '.join(values[event])}")
+
+            elif event == "EngineStatus":
+                sg.popup(engine_status_report(engines, governor), title="Engine Status")
+
+            elif event == "GameReport":
+                show_game_report(engines)
+
             elif event == "HumanVSEngine":
-                engine_name, difficulty = select_engine(engines)
+                engine_name, difficulty, time_control = select_engine(engines)
                 if engine_name:
                     human_side = select_side()
                     if human_side:
-                        play_game(
-                            human_side=human_side,
-                            engine=engines[engine_name],
-                            engines=engines,
-                            main_window=window,
-                            save_path=HUMAN_VS_ENGINE_PATH,
-                            game_number=1,
-                            difficulty=difficulty
-                        )
+                        # The game gets its own engine instance, returned to the pool when it ends
+                        with engines[engine_name].instance() as engine:
+                            play_game(
+                                human_side=human_side,
+                                engine=engine,
+                                engines=engines,
+                                main_window=window,
+                                save_path=HUMAN_VS_ENGINE_PATH,
+                                game_number=1,
+                                difficulty=difficulty,
+                                time_control=time_control
+                            )
 
             elif event == "EngineVSEngine":
-                engine1_name, engine2_name, difficulty1, difficulty2 = select_two_engines(engines)
+                engine1_name, engine2_name, difficulty1, difficulty2, time_control = select_two_engines(engines)
                 if engine1_name and engine2_name:
-                    engine1 = CustomEngine(engines[engine1_name], difficulty1)
-                    engine2 = CustomEngine(engines[engine2_name], difficulty2)
-                    engine_vs_engine_game(
-                        engine1=engine1,
-                        engine2=engine2,
-                        main_window=window,
-                        save_path=ENGINE_VS_ENGINE_PATH,
-                        game_number=1,
-                        engine1_name=engine1_name,
-                        engine2_name=engine2_name
-                    )
+                    # Separate instances even when both sides use the same engine, so they never share a search
+                    with engines[engine1_name].instance() as instance1, engines[engine2_name].instance() as instance2:
+                        engine1 = CustomEngine(instance1, difficulty1)
+                        engine2 = CustomEngine(instance2, difficulty2)
+                        engine_vs_engine_game(
+                            engine1=engine1,
+                            engine2=engine2,
+                            main_window=window,
+                            save_path=ENGINE_VS_ENGINE_PATH,
+                            game_number=1,
+                            engine1_name=engine1_name,
+                            engine2_name=engine2_name,
+                            time_control=time_control
+                        )
 
             elif event == "Analyze":
                 mode = select_analysis_mode()
@@ -1447,6 +4508,18 @@ def main():
                         initial_folder=PGN_FOLDER_PATH
                     )
                     if fen_or_pgn_input and os.path.exists(fen_or_pgn_input):
+                        # Index the file once and only parse the game the user picks
+                        try:
+                            pgn_index = PgnIndex(fen_or_pgn_input)
+                            if not len(pgn_index):
+                                raise ValueError("No games found.")
+                            number = select_pgn_game(pgn_index)
+                            if number is None:
+                                continue
+                            fen_or_pgn_input = str(pgn_index.read_game(number))
+                        except Exception as e:
+                            sg.popup_error(f"Error reading PGN file: {e}")
+                            continue
                         analyze_position(
                             fen_or_pgn_input=fen_or_pgn_input,
                             main_window=window,
@@ -1482,12 +4555,19 @@ def main():
                         game_number=1
                     )
 
+        governor.stop()
         window.close()
         for engine in engines.values():
             engine.quit()
+        TELEMETRY.close()
+        EVAL_STORE.close()
 
     except Exception as e:
         sg.popup_error(f"An error occurred: {e}")
 
 if __name__ == "__main__":
-    main()
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        run_cli(sys.argv[1:])
+    else:
+        main()
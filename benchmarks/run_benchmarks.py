@@ -0,0 +1,342 @@
+"""
+Measures Chessli's own overhead with the stub UCI engine in this folder, so it runs anywhere
+(including CI machines without the bundled Windows engines) and writes the results as JSON.
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import queue
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import chess
+import chess.engine
+import chess.pgn
+
+import Chessli
+
+STUB_ENGINE = os.path.join(BENCHMARK_DIR, 'stub_engine.py')
+RESULTS_PATH = os.path.join(BENCHMARK_DIR, 'results')
+
+
+def stub_command(think, moves='first', seed=None):
+    command = [sys.executable, STUB_ENGINE, '--think', str(think), '--moves', moves]
+    if seed is not None:
+        command += ['--seed', str(seed)]
+    return command
+
+
+def summarize(samples, **extra):
+    # Timings in milliseconds
+    ordered = sorted(samples)
+    summary = {
+        'runs': len(ordered),
+        'mean_ms': 1000 * statistics.fmean(ordered),
+        'p50_ms': 1000 * ordered[len(ordered) // 2],
+        'p90_ms': 1000 * ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))],
+        'max_ms': 1000 * ordered[-1],
+    }
+    summary.update(extra)
+    return summary
+
+
+def random_games(count, plies, seed=0):
+    rng = random.Random(seed)
+    games = []
+    for number in range(count):
+        board = chess.Board()
+        game = chess.pgn.Game()
+        game.headers["White"] = f"White {number}"
+        game.headers["Black"] = f"Black {number}"
+        node = game
+        while len(board.move_stack) < plies and not board.is_game_over():
+            move = rng.choice(list(board.legal_moves))
+            board.push(move)
+            node = node.add_variation(move)
+        game.headers["Result"] = board.result()
+        games.append(game)
+    return games
+
+
+class EventSink:
+    """
+    Stands in for a window: collects write_event_value calls in a queue.
+    """
+    def __init__(self):
+        self.events = queue.Queue()
+
+    def write_event_value(self, key, value):
+        self.events.put((key, value))
+
+
+class FakeListbox:
+    """
+    Just enough of a PySimpleGUI Listbox (and its tk widget) for MoveList.
+    """
+    def __init__(self):
+        self.Widget = self
+        self.Values = []
+        self.items = []
+
+    def insert(self, index, *labels):
+        self.items.extend(labels)
+
+    def delete(self, first, last=None):
+        del self.items[first:]
+
+    def selection_clear(self, first, last=None):
+        pass
+
+    def update(self, **kwargs):
+        pass
+
+
+def bench_engine_startup(args):
+    samples = []
+    for _ in range(args.repeat):
+        engine = Chessli.LazyEngine('Stub', stub_command(args.think), eval_store=None)
+        start = time.perf_counter()
+        engine.start().result()
+        samples.append(time.perf_counter() - start)
+        engine.quit()
+    return summarize(samples)
+
+
+def bench_hint_round_trip(args):
+    # Submit to the engine worker and wait for the posted result, like the Hint button
+    # Without the eval store, so every hint reaches the engine
+    engine = Chessli.LazyEngine('Stub', stub_command(args.think), eval_store=None)
+    custom_engine = Chessli.CustomEngine(engine, "Impossible", telemetry=None)
+    engine.start().result()
+    sink = EventSink()
+    worker = Chessli.EngineWorker(sink)
+    positions = [board.board() for board in random_games(args.repeat, 20, seed=1)]
+    samples = []
+    try:
+        for position in positions:
+            engine.analysis_cache.clear()
+            start = time.perf_counter()
+            worker.submit('hint', lambda cancel, position=position: custom_engine.analyse(
+                position, chess.engine.Limit(time=0.1), cancel=cancel))
+            sink.events.get()
+            worker.finish('hint')
+            samples.append(time.perf_counter() - start)
+    finally:
+        worker.close()
+        engine.quit()
+    return summarize(samples, engine_think_ms=1000 * args.think)
+
+
+def bench_eve_moves(args):
+    # Headless engine vs engine games at full strength, every move goes to the stub engine
+    white = Chessli.LazyEngine('Stub', stub_command(args.think, 'random', seed=2), eval_store=None)
+    black = Chessli.LazyEngine('Stub', stub_command(args.think, 'random', seed=3), eval_store=None)
+    samples = []
+    moves = 0
+    try:
+        for engine in (white, black):
+            engine.start().result()
+        for _ in range(max(1, args.repeat // 10)):
+            latency = Chessli.LatencyStats()
+            start = time.perf_counter()
+            game = Chessli.play_headless_game(
+                Chessli.CustomEngine(white, "Impossible", book=None, latency=latency, telemetry=None),
+                Chessli.CustomEngine(black, "Impossible", book=None, latency=latency, telemetry=None),
+                "White", "Black", max_plies=args.plies)
+            samples.append(time.perf_counter() - start)
+            moves += len(game.end().board().move_stack)
+    finally:
+        white.quit()
+        black.quit()
+    return summarize(samples, moves=moves, moves_per_second=moves / sum(samples),
+                     engine_think_ms=1000 * args.think)
+
+
+def bench_pgn_load_save(args):
+    games = random_games(args.games, args.plies)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'games.pgn')
+        start = time.perf_counter()
+        with open(path, 'w') as pgn_file:
+            exporter = chess.pgn.FileExporter(pgn_file)
+            for game in games:
+                game.accept(exporter)
+        save_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(path) as pgn_file:
+            while chess.pgn.read_game(pgn_file) is not None:
+                pass
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = Chessli.PgnIndex(path)
+        index_time = time.perf_counter() - start
+
+        # The same games behind a UTF-8 byte order mark, as written by many Windows tools
+        bom_path = os.path.join(folder, 'games_bom.pgn')
+        with open(path, 'rb') as pgn_file, open(bom_path, 'wb') as bom_file:
+            bom_file.write(b'\xef\xbb\xbf' + pgn_file.read())
+        bom_index = Chessli.PgnIndex(bom_path)
+        for checked in (index, bom_index):
+            if len(checked) != len(games) or checked.read_game(0).headers != games[0].headers:
+                raise RuntimeError(f"{os.path.basename(checked.path)}: indexed {len(checked)} of {len(games)} games")
+
+        samples = []
+        rng = random.Random(4)
+        for _ in range(args.repeat):
+            number = rng.randrange(len(index))
+            start = time.perf_counter()
+            index.read_game(number)
+            samples.append(time.perf_counter() - start)
+
+    return {
+        'games': len(games),
+        'save_ms': 1000 * save_time,
+        'load_ms': 1000 * load_time,
+        'index_build_ms': 1000 * index_time,
+        'indexed_games': len(index),
+        'indexed_games_with_bom': len(bom_index),
+        'indexed_game_open': summarize(samples),
+    }
+
+
+def bench_move_list(args):
+    game = random_games(1, args.plies, seed=5)[0]
+    end = game.end()
+    rebuild, append = [], []
+    for _ in range(args.repeat):
+        move_list = Chessli.MoveList(FakeListbox(), notation='san')
+        start = time.perf_counter()
+        move_list.sync(end)
+        rebuild.append(time.perf_counter() - start)
+
+        # One more move on top of a listed line, as after every move in a game
+        start = time.perf_counter()
+        move_list.sync(end.parent)
+        move_list.sync(end)
+        append.append((time.perf_counter() - start) / 2)
+    return {'plies': args.plies, 'full_rebuild': summarize(rebuild), 'incremental_update': summarize(append)}
+
+
+def bench_board_diff(args):
+    game = random_games(1, args.plies, seed=6)[0]
+    board = game.board()
+    samples = []
+    previous = Chessli.board_square_states(board)
+    for move in game.mainline_moves():
+        board.push(move)
+        start = time.perf_counter()
+        current = Chessli.board_square_states(board, {move.from_square, move.to_square})
+        Chessli.diff_square_states(previous, current)
+        samples.append(time.perf_counter() - start)
+        previous = current
+    return summarize(samples)
+
+
+def bench_builtin_search(args):
+    # The in-process search of the low levels, on middlegame positions from random games
+    positions = [game.end().board() for game in random_games(args.repeat, 30, seed=7)]
+    results = {}
+    for difficulty in Chessli.DIFFICULTY_LEVELS:
+        if Chessli.needs_engine(difficulty):
+            continue
+        settings = Chessli.DIFFICULTY_SETTINGS[difficulty]
+        search = Chessli.BuiltinSearch()
+        samples = []
+        for position in positions:
+            start = time.perf_counter()
+            search.search(position, settings['builtin'], settings.get('nodes'), settings.get('time'))
+            samples.append(time.perf_counter() - start)
+        # The level's time cap is checked every few nodes, so allow it a small overshoot
+        p99 = sorted(samples)[min(len(samples) - 1, int(0.99 * len(samples)))]
+        budget = settings.get('time')
+        results[difficulty] = summarize(samples, p99_ms=1000 * p99, budget_ms=1000 * budget if budget else None,
+                                        within_budget=budget is None or p99 <= 1.2 * budget)
+    return results
+
+
+BENCHMARKS = {
+    'engine_startup': bench_engine_startup,
+    'hint_round_trip': bench_hint_round_trip,
+    'eve_moves': bench_eve_moves,
+    'pgn_load_save': bench_pgn_load_save,
+    'move_list': bench_move_list,
+    'board_diff': bench_board_diff,
+    'builtin_search': bench_builtin_search,
+}
+
+
+def flatten(results, prefix=''):
+    # {'a': {'b': 1}} -> {'a.b': 1}, for comparing runs
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(results, baseline):
+    old = flatten(baseline.get('results', {}))
+    lines = []
+    for key, value in flatten(results).items():
+        if key in old and old[key] and (key.endswith('_ms') or key.endswith('_second')):
+            lines.append(f"{key:<50} {old[key]:>10.3f} -> {value:>10.3f}  ({100.0 * (value / old[key] - 1):+.1f}%)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chessli benchmark suite")
+    parser.add_argument("benchmarks", nargs="*", metavar="BENCHMARK",
+                        help=f"Benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=20, help="Samples per benchmark")
+    parser.add_argument("--think", type=float, default=0.0, help="Stub engine think time in seconds")
+    parser.add_argument("--plies", type=int, default=120, help="Plies per generated or played game")
+    parser.add_argument("--games", type=int, default=500, help="Games in the PGN load/save benchmark")
+    parser.add_argument("--output", default=None, help="JSON file for the results (default: results/<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    results = {}
+    for name in args.benchmarks or list(BENCHMARKS):
+        start = time.perf_counter()
+        results[name] = BENCHMARKS[name](args)
+        print(f"{name}: done in {time.perf_counter() - start:.1f}s")
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'python_chess': chess.__version__,
+        'settings': {'repeat': args.repeat, 'think': args.think, 'plies': args.plies, 'games': args.games},
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_PATH, f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as json_file:
+        json.dump(report, json_file, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as json_file:
+            print(compare(results, json.load(json_file)))
+
+
+if __name__ == "__main__":
+    main()
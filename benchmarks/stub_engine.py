@@ -0,0 +1,147 @@
+"""
+Minimal UCI engine for benchmarking Chessli without real engines.
+
+Every search takes a fixed think time (or runs until stop/ponderhit for infinite and ponder
+searches) and reports a bestmove chosen from the legal moves, so the measured time is Chessli's
+own overhead plus a known, configurable engine cost.
+
+    python stub_engine.py --think 0.01 --moves random --seed 1
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+import chess
+
+
+OPTIONS = [
+    "option name Hash type spin default 16 min 1 max 1024",
+    "option name MultiPV type spin default 1 min 1 max 10",
+    "option name Ponder type check default false",
+    "option name Skill Level type spin default 20 min 0 max 20",
+    "option name UCI_LimitStrength type check default false",
+    "option name UCI_Elo type spin default 1320 min 1320 max 3190",
+]
+
+
+class StubEngine:
+    def __init__(self, think, moves, seed, startup):
+        self.think = think
+        self.moves = moves
+        self.random = random.Random(seed)
+        self.startup = startup
+        self.board = chess.Board()
+        self.multipv = 1
+        self.stop_event = threading.Event()
+        self.ponderhit_event = threading.Event()
+        self.search_thread = None
+        self.output_lock = threading.Lock()
+
+    def send(self, line):
+        with self.output_lock:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+
+    def ordered_moves(self, board):
+        moves = sorted(board.legal_moves, key=lambda move: move.uci())
+        if self.moves == 'random':
+            self.random.shuffle(moves)
+        return moves
+
+    def search(self, board, infinite, ponder):
+        start = time.perf_counter()
+        if ponder:
+            # Wait for the opponent's move to be confirmed, then search normally
+            while not self.stop_event.is_set() and not self.ponderhit_event.wait(0.001):
+                pass
+            start = time.perf_counter()
+        moves = self.ordered_moves(board)
+        depth = 0
+        while True:
+            depth += 1
+            elapsed = time.perf_counter() - start
+            nodes = 1000 * depth
+            for rank, move in enumerate(moves[:self.multipv], start=1):
+                self.send(f"info depth {depth} seldepth {depth + 2} multipv {rank} score cp {25 - 5 * rank} "
+                          f"nodes {nodes} nps {int(nodes / max(elapsed, 0.001))} hashfull {min(1000, depth)} "
+                          f"time {int(1000 * elapsed)} pv {move.uci()}")
+            if self.stop_event.is_set() or (not infinite and elapsed >= self.think):
+                break
+            self.stop_event.wait(min(0.005, max(self.think - elapsed, 0.0)) if not infinite else 0.005)
+
+        if not moves:
+            self.send("bestmove (none)")
+            return
+        best = moves[0]
+        board.push(best)
+        replies = self.ordered_moves(board)
+        self.send(f"bestmove {best.uci()}" + (f" ponder {replies[0].uci()}" if replies else ""))
+
+    def stop_search(self):
+        self.stop_event.set()
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+    def set_position(self, tokens):
+        if tokens[1] == 'startpos':
+            board = chess.Board()
+            rest = tokens[2:]
+        else:
+            end = tokens.index('moves') if 'moves' in tokens else len(tokens)
+            board = chess.Board(" ".join(tokens[2:end]))
+            rest = tokens[end:]
+        for uci in rest[1:]:
+            board.push_uci(uci)
+        self.board = board
+
+    def run(self):
+        for line in sys.stdin:
+            tokens = line.split()
+            if not tokens:
+                continue
+            command = tokens[0]
+            if command == 'uci':
+                time.sleep(self.startup)
+                self.send("id name Chessli Stub")
+                self.send("id author Chessli")
+                for option in OPTIONS:
+                    self.send(option)
+                self.send("uciok")
+            elif command == 'isready':
+                self.send("readyok")
+            elif command == 'setoption' and len(tokens) >= 5 and tokens[2].lower() == 'multipv':
+                self.multipv = int(tokens[4])
+            elif command == 'position':
+                self.set_position(tokens)
+            elif command == 'go':
+                self.stop_search()
+                self.stop_event.clear()
+                self.ponderhit_event.clear()
+                self.search_thread = threading.Thread(
+                    target=self.search, args=(self.board.copy(), 'infinite' in tokens, 'ponder' in tokens), daemon=True)
+                self.search_thread.start()
+            elif command == 'ponderhit':
+                self.ponderhit_event.set()
+            elif command == 'stop':
+                self.stop_search()
+            elif command == 'quit':
+                self.stop_search()
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UCI stub engine for Chessli benchmarks")
+    parser.add_argument("--think", type=float, default=0.01, help="Seconds spent on every search")
+    parser.add_argument("--moves", choices=("first", "random"), default="first",
+                        help="Play the first legal move in UCI order or a random one")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for --moves random")
+    parser.add_argument("--startup", type=float, default=0.0, help="Seconds to wait before answering 'uci'")
+    args = parser.parse_args()
+    StubEngine(args.think, args.moves, args.seed, args.startup).run()
+
+
+if __name__ == "__main__":
+    main()